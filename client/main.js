@@ -1 +1,45 @@
-// YOUR JAVASCRIPT CODE FOR INDEX.HTML GOES HERE
+// Ticket lookups and creation through the ticket_mate_function Basic I/O endpoint
+const TICKET_API = "/server/ticket_mate_function/execute";
+
+async function callTicketApi(params) {
+    const response = await fetch(TICKET_API, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(params)
+    });
+    const body = await response.json();
+    // Basic I/O functions wrap whatever the handler wrote in "output"
+    return JSON.parse(body.output);
+}
+
+function getTickets(ids) {
+    return callTicketApi({ action: "get", ids: ids.join(",") });
+}
+
+function createTicket(subject, description, email, priority) {
+    return callTicketApi({ action: "create", subject, description, email, priority });
+}
+
+function renderTickets(result) {
+    const out = document.getElementById("results");
+    out.innerHTML = "";
+    if (!result.success) {
+        out.textContent = "Error: " + result.error;
+        return;
+    }
+    Object.entries(result.data).forEach(([id, ticket]) => {
+        const row = document.createElement("li");
+        row.textContent = ticket.success
+            ? `#${ticket.data.ticketNumber || id} - ${ticket.data.status} - ${ticket.data.subject}`
+            : `#${id} - ${ticket.error}`;
+        out.appendChild(row);
+    });
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+    document.getElementById("lookup-form").addEventListener("submit", async (event) => {
+        event.preventDefault();
+        const ids = document.getElementById("ticket-ids").value.match(/\d{5,}/g) || [];
+        renderTickets(await getTickets(ids));
+    });
+});
@@ -1,6 +1,86 @@
-def handler(context, basicio):
-    basicio.write('Hello from main.py')
-    basicio.get_argument('name')
+"""Catalyst Basic I/O endpoint for ticket lookups and creation.
+
+Arguments (query string or JSON body):
+
+    action=get     ids=12345,67890 (or id=12345)  -> {ticket_id: result}
+    action=create  subject, description, email, priority
+
+The response is a JSON string in ``output`` shaped like the ZohoDeskAPI
+results (``success`` plus ``data`` or ``error``) with a ``timing`` block.
+
+The ZohoDeskAPI client (HTTP pool, OAuth token, ticket cache and fan-out
+pool) is built lazily on the first invocation and kept at module level, so
+warm invocations reuse it. Configure it with the ZOHO_* environment
+variables in catalyst-config.json; the client modules are copied next to
+this file by the ``bundle-ticket-api`` pipeline job.
+"""
+import json
+import os
+import sys
+import time
+
+MAX_BATCH = 50
+
+_api = None
+_cold_start_ms = None
+
 
-    context.log('Successfully executed basicio function')
+def _get_api():
+    """Build the shared client on first use; returns (api, was_cold)"""
+    global _api, _cold_start_ms
+    if _api is not None:
+        return _api, False
+    started = time.perf_counter()
+    try:
+        from zoho_api import ZohoDeskAPI
+    except ImportError:
+        # Running from the repository (e.g. `catalyst serve`) without the bundle step
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "helpdesk-bot-main"))
+        from zoho_api import ZohoDeskAPI
+    os.environ.setdefault("ZOHO_TOKEN_CACHE_FILE", "/tmp/zoho_token.json")
+    _api = ZohoDeskAPI()
+    _cold_start_ms = (time.perf_counter() - started) * 1000
+    return _api, True
+
+
+def _ticket_ids(basicio):
+    ids = basicio.get_argument('ids') or basicio.get_argument('id') or []
+    if isinstance(ids, (int, str)):
+        ids = str(ids).split(',')
+    return [str(t).strip() for t in ids if str(t).strip()]
+
+
+def _dispatch(api, basicio):
+    action = basicio.get_argument('action') or 'get'
+    if action == 'get':
+        ids = _ticket_ids(basicio)
+        if not ids:
+            return {'success': False, 'error': 'Provide a ticket id or ids'}
+        if len(ids) > MAX_BATCH:
+            return {'success': False, 'error': f'At most {MAX_BATCH} ticket ids per request'}
+        return {'success': True, 'data': api.get_tickets(ids)}
+    if action == 'create':
+        subject = basicio.get_argument('subject')
+        description = basicio.get_argument('description')
+        email = basicio.get_argument('email')
+        if not subject or not description or not email:
+            return {'success': False, 'error': 'subject, description and email are required'}
+        return api.create_ticket(subject, description, email, basicio.get_argument('priority') or "High")
+    return {'success': False, 'error': f'Unknown action: {action}'}
+
+
+def handler(context, basicio):
+    started = time.perf_counter()
+    api, cold = _get_api()
+    try:
+        response = _dispatch(api, basicio)
+    except Exception as e:
+        response = {'success': False, 'error': str(e)}
+    response['timing'] = {
+        'cold_start': cold,
+        'init_ms': round(_cold_start_ms, 2) if cold else 0,
+        'handler_ms': round((time.perf_counter() - started) * 1000, 2)
+    }
+    basicio.write(json.dumps(response))
+    context.log(f"ticket_mate_function cold={cold} handler_ms={response['timing']['handler_ms']}")
     context.close()
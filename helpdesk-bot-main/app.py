@@ -1,91 +1,36 @@
-from streamlit_lottie import st_lottie
 import streamlit as st
-from mock_api import MockZohoDeskAPI as ZohoDeskAPI, format_ticket_display
-import re
-import requests
+from backends import create_api
+from formatting import format_ticket_display, format_ticket_summary, format_comment
+from theme import THEME_CSS, BANNER_HTML
+from lottie_assets import load_lottie
+from chat_history import ChatHistory
+from config import get_setting
+from bot import process_message, render_record, fetch_ticket_view, stream_comments, COMMENT_PAGE_SIZE
+from metrics import METRICS, profiled, profile_report
+from outbox import Outbox
+from bulk_import import BulkImporter, iter_rows, detect_format, validate_ticket, file_fingerprint
+import io
+import os
+import uuid
 
-# ----- Custom THEME CSS (Dark background and accent colors) -----
-st.markdown("""
-    <style>
-    body, [data-testid="stAppViewContainer"], [data-testid="stHeader"], .css-1d391kg {background-color: #191c24 !important;}
-    h1, h2, h3, h4, h5, h6, div, code, p, span, label {
-        color: #f7f7fb !important;
-        font-weight: bold !important;
-        letter-spacing: 0.02em;
-    }
-    .big-font {font-size:30px !important; color:#1598FF;text-shadow: 0 0 18px #FF914D;}
-    .stButton>button, button {
-        background-color: #1598FF !important;
-        color: #fff !important;
-        border-radius: 8px !important;
-        font-weight: bold !important;
-        border: none !important;
-        box-shadow: 0 0 10px #1598FF44 !important;
-        transition: background 0.2s;
-    }
-    .stButton>button:hover, button:hover {
-        background-color: #FF914D !important;
-        color: #fff !important;
-    }
-    [data-testid="stSidebar"], section[data-testid="stSidebar"] {
-        background: linear-gradient(135deg, #232534 80%, #1598FF 100%) !important;
-        color: #fff !important;
-    }
-    [data-testid="stSidebar"] h1, [data-testid="stSidebar"] h2, [data-testid="stSidebar"] h3, 
-    [data-testid="stSidebar"] h4, [data-testid="stSidebar"] h5, [data-testid="stSidebar"] h6, 
-    [data-testid="stSidebar"] div, [data-testid="stSidebar"] p, [data-testid="stSidebar"] label {
-        color: #fff !important;
-        text-shadow: 0 0 4px #1598FFCC;
-        font-weight: bold !important;
-    }
-    .glass-card {
-        background: rgba(21,152,255,0.08); 
-        border-radius:18px; 
-        padding:26px 34px 22px 34px;
-        box-shadow:0 8px 28px rgba(255,145,77,0.13); 
-        margin-bottom:22px;
-    }
-    .glass-card * {
-        color: #f0f0f0 !important;
-    }
-    .glass-card b {
-        color: #1598FF !important;
-    }
-    .glass-card span[style*="color:#FF914D"] {
-        color: #FF914D !important;
-    }
-    .accent-title {color: #FF914D !important; text-shadow: 0 0 12px #1598FF;}
-    .accent-hr {border: 1px solid #FF914D; border-radius: 6px; margin-bottom: 12px;}
-    
-    /* --- Make Priority Dropdown Options Visible in Black --- */
-    [data-baseweb="select"] > div {
-        color: #000 !important;
-        background-color: #fff !important;
-    }
-    [data-baseweb="select"] div[role="option"] {
-        color: #000 !important;
-        background-color: #fff !important;
-        font-weight: bold !important;
-    }
-    [data-baseweb="select"] div[role="option"]:hover {
-        background-color: #e8e8e8 !important;
-        color: #000 !important;
-    }
-    </style>
-""", unsafe_allow_html=True)
+# ----- Page configuration -----
+st.set_page_config(
+    page_title="Helpdesk Bot",
+    page_icon="🎫",
+    layout="wide"
+)
 
-# ----- Modern UI Functions -----
-def load_lottieurl(url):
-    r = requests.get(url)
-    if r.status_code != 200:
-        return None
-    return r.json()
+# ----- Custom THEME CSS -----
+st.markdown(THEME_CSS, unsafe_allow_html=True)
 
+# ----- Modern UI Functions -----
 def show_banner():
-    st.markdown('<p class="big-font">Welcome to your smart helpdesk assistant!</p>', unsafe_allow_html=True)
+    from streamlit_lottie import st_lottie  # only needed on pages with the banner
+    st.markdown(BANNER_HTML, unsafe_allow_html=True)
     lottie_url = "https://assets10.lottiefiles.com/packages/lf20_jcikwtux.json"
-    lottie_ticket = load_lottieurl(lottie_url)
-    st_lottie(lottie_ticket, height=200, key="ticket")
+    lottie_ticket = load_lottie(lottie_url)
+    if lottie_ticket:
+        st_lottie(lottie_ticket, height=200, key="ticket")
 
 def modern_section_header(icon, title):
     st.markdown(f"""
@@ -110,19 +55,25 @@ def progress_meter(step:int, total:int, label:str):
         <progress value="{percent}" max="100" style="width:94%;height:16px; accent-color:#1598FF;"></progress>
     """, unsafe_allow_html=True)
 
-# ----- Page configuration -----
-st.set_page_config(
-    page_title="Helpdesk Bot",
-    page_icon="🎫",
-    layout="wide"
-)
 
 # ----- Initialize API -----
 @st.cache_resource
 def get_api():
-    return ZohoDeskAPI()
+    return create_api()
 zoho = get_api()
 
+@st.cache_resource
+def get_outbox():
+    return Outbox(
+        get_api(),
+        get_setting("OUTBOX_PATH", ".cache/outbox.sqlite3"),
+        workers=int(get_setting("OUTBOX_WORKERS", 2))
+    ).start()
+outbox = get_outbox()
+
+# ----- Diagnostics -----
+PROFILE_MODE = get_setting("HELPDESK_PROFILE", "")  # "cprofile" or "sample" to profile chat handling
+
 # ----- Sidebar -----
 with st.sidebar:
     st.title("🎫 Helpdesk Bot")
@@ -141,36 +92,36 @@ with st.sidebar:
     </div>
 """, unsafe_allow_html=True)
 
-# ----- Initialize session state -----
-if "messages" not in st.session_state:
-    st.session_state.messages = [
-        {"role": "assistant", "content": "👋 Hello! I'm your helpdesk assistant. How can I help you today?\n\n- Check ticket status\n- Create new ticket\n- Add comments"}
-    ]
-
-# ----- Function to process chat messages -----
-def process_message(user_input, api):
-    ticket_match = re.search(r'\b\d{5,}\b', user_input)
-    if ticket_match:
-        ticket_id = ticket_match.group()
-        result = api.get_ticket(ticket_id)
-        if result['success']:
-            return format_ticket_display(result)
-        else:
-            return f"❌ {result['error']}"
-    elif "create" in user_input.lower() or "new ticket" in user_input.lower():
-        return "Please use the '🆕 Create Ticket' option in the sidebar to create a new ticket."
-    elif "help" in user_input.lower():
-        return """
-        I can help you with:
+    if st.checkbox("📊 Show diagnostics"):
+        st.markdown("**API latency by endpoint**")
+        st.dataframe(METRICS.latency_summary(), use_container_width=True)
+        st.code(METRICS.export_prometheus(), language="text")
+        if PROFILE_MODE:
+            st.markdown(f"**process_message profile ({PROFILE_MODE})**")
+            st.code(profile_report("process_message", PROFILE_MODE) or "No samples yet", language="text")
 
-        <span style="color:#1598FF;font-weight:bold;">1️⃣ Check Ticket Status</span> - Just type or paste your ticket ID  
-        <span style="color:#1598FF;font-weight:bold;">2️⃣ Create New Ticket</span> - Use the sidebar menu  
-        <span style="color:#1598FF;font-weight:bold;">3️⃣ Search Tickets</span> - Use the search option in sidebar  
-        
-        Try typing a ticket ID like: <span style='color:#FF914D'>12345</span>
-        """
-    else:
-        return "I didn't quite understand that. You can:<br>- Type a ticket ID to check status<br>- Type 'help' for more options<br>- Use the sidebar menu for other actions"
+# ----- Initialize session state -----
+CHAT_PAGE_SIZE = int(get_setting("CHAT_PAGE_SIZE", 20))
+if "history" not in st.session_state:
+    st.session_state.history = ChatHistory(
+        max_messages=int(get_setting("CHAT_HISTORY_MAX_MESSAGES", 500)),
+        max_bytes=int(get_setting("CHAT_HISTORY_MAX_BYTES", 256 * 1024))
+    )
+    st.session_state.history.add_text(
+        "assistant",
+        "👋 Hello! I'm your helpdesk assistant. How can I help you today?\n\n- Check ticket status\n- Create new ticket\n- Add comments"
+    )
+if "visible_messages" not in st.session_state:
+    st.session_state.visible_messages = CHAT_PAGE_SIZE
+if "pending_tickets" not in st.session_state:
+    st.session_state.pending_tickets = []
+if "viewed_ticket" not in st.session_state:
+    st.session_state.viewed_ticket = None
+    st.session_state.older_comments = []
+    st.session_state.comment_page = (None, None)
+if "form_key" not in st.session_state:
+    # Idempotency key for the current form submission; renewed once it is queued
+    st.session_state.form_key = uuid.uuid4().hex
 
 # ----------------- CHAT INTERFACE -----------------
 if menu == "💬 Chat":
@@ -180,22 +131,26 @@ if menu == "💬 Chat":
       "<b style='color:#FF914D;'>Tip:</b> Type your ticket ID or a request (e.g. 'create new ticket') below!"
     )
 
-    # Display chat messages
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"], unsafe_allow_html=True)
+    # Display only the most recent chat messages
+    history = st.session_state.history
+    if len(history) > st.session_state.visible_messages:
+        if st.button("⬆️ Load earlier messages"):
+            st.session_state.visible_messages += CHAT_PAGE_SIZE
+    for role, kind, payload in history.tail(st.session_state.visible_messages):
+        with st.chat_message(role):
+            st.markdown(render_record(kind, payload, zoho), unsafe_allow_html=True)
 
     # Floating chat input
     if prompt := st.chat_input("🔥 Send a message to the bot..."):
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        history.add_text("user", prompt)
         with st.chat_message("user"):
             st.markdown(prompt, unsafe_allow_html=True)
         # Process user input
         with st.chat_message("assistant"):
             with st.spinner("Thinking..."):
-                response = process_message(prompt, zoho)
-                st.markdown(response, unsafe_allow_html=True)
-                st.session_state.messages.append({"role": "assistant", "content": response})
+                kind, payload = profiled("process_message", PROFILE_MODE, process_message, prompt, zoho, outbox)
+                st.markdown(render_record(kind, payload, zoho), unsafe_allow_html=True)
+                history.append("assistant", kind, payload)
 
 # ----------------- CREATE TICKET INTERFACE -----------------
 elif menu == "🆕 Create Ticket":
@@ -213,25 +168,76 @@ elif menu == "🆕 Create Ticket":
         submitted = st.form_submit_button("🚀 CREATE TICKET", use_container_width=True)
         if submitted:
             progress_meter(2, 3, "Step 2: Creating Ticket...")
-            if not email or not subject or not description:
+            if validate_ticket(email, subject, description, priority):
                 st.error("❌ Please fill all required fields marked with *")
             else:
-                with st.spinner("Creating ticket..."):
-                    result = zoho.create_ticket(subject, description, email, priority)
-                    if result['success']:
-                        ticket = result['data']
-                        st.success("✅ Ticket created successfully!")
-                        st.balloons()
-                        progress_meter(3, 3, "Step 3: Ticket Created!")
-                        st.markdown(f"""
-                            <div class="glass-card">
-                                <b style='color:#1598FF;'>Ticket Number:</b> <span style='color:#FF914D;'>#{ticket.get('ticketNumber')}</span><br>
-                                <b style='color:#1598FF;'>Status:</b> {ticket.get('status')}<br>
-                                You will receive updates via email at: <span style='color:#FF914D;'>{email}</span>
-                            </div>
-                        """, unsafe_allow_html=True)
-                    else:
-                        st.error(f"❌ Failed to create ticket: {result['error']}")
+                result = outbox.enqueue_ticket(
+                    subject, description, email, priority, idempotency_key=st.session_state.form_key
+                )
+                st.session_state.form_key = uuid.uuid4().hex
+                if result['data']['id'] not in st.session_state.pending_tickets:
+                    st.session_state.pending_tickets.append(result['data']['id'])
+                st.success("⏳ Ticket queued! Your ticket number will appear below once Zoho confirms it.")
+                progress_meter(3, 3, "Step 3: Ticket Queued!")
+
+    with st.expander("📥 Bulk import from CSV or JSONL"):
+        st.caption("Columns: email, subject, description and optional priority. "
+                   "Rows repeating an earlier subject and email are skipped.")
+        upload = st.file_uploader("Ticket file", type=["csv", "jsonl"])
+        if upload is not None and st.button("📥 IMPORT TICKETS", use_container_width=True):
+            # Keyed by content so re-uploading the same file resumes the import
+            checkpoint = os.path.join(get_setting("IMPORT_DIR", ".cache/imports"), f"{file_fingerprint(upload)}.sqlite3")
+            importer = BulkImporter(
+                zoho, checkpoint,
+                workers=int(get_setting("IMPORT_WORKERS", 8)),
+                rate=float(get_setting("IMPORT_RATE_PER_SECOND", 5))
+            )
+            bar = st.progress(0.0, text="Importing...")
+            def show_progress(seen, counts):
+                bar.progress(min(1.0, upload.tell() / max(upload.size, 1)),
+                             text=f"{seen} rows read, {counts['created']} created, {counts['failed']} failed")
+            rows = iter_rows(io.TextIOWrapper(upload, encoding="utf-8-sig", newline=""), detect_format(upload.name))
+            try:
+                counts = importer.run(rows, progress=show_progress)
+                report = io.StringIO()
+                importer.write_report(report)
+            finally:
+                importer.close()
+            bar.progress(1.0, text="Import finished")
+            st.success(
+                f"✅ {counts['created']} created, {counts['duplicate']} duplicates skipped, "
+                f"{counts['invalid']} invalid, {counts['failed']} failed"
+                + (f", {counts['review']} to check in Zoho (see report)" if counts['review'] else "")
+                + (f", {counts['resumed']} already imported" if counts['resumed'] else "")
+            )
+            st.download_button("⬇️ Download report", report.getvalue(),
+                               file_name=f"{upload.name}.report.csv", mime="text/csv")
+
+    # Submissions are delivered in the background; show their latest status
+    if st.session_state.pending_tickets:
+        st.markdown("### <span class='accent-title'>Your Submissions</span>", unsafe_allow_html=True)
+        st.button("🔄 Refresh status")
+        for key in st.session_state.pending_tickets:
+            entry = outbox.status(key)
+            if entry is None:
+                continue
+            if entry['status'] == 'done':
+                ticket = entry['result']
+                st.markdown(f"""
+                    <div class="glass-card">
+                        <b style='color:#1598FF;'>Ticket Number:</b> <span style='color:#FF914D;'>#{ticket.get('ticketNumber')}</span><br>
+                        <b style='color:#1598FF;'>Subject:</b> {ticket.get('subject')}<br>
+                        <b style='color:#1598FF;'>Status:</b> {ticket.get('status')}<br>
+                        You will receive updates via email at: <span style='color:#FF914D;'>{ticket.get('email', '')}</span>
+                    </div>
+                """, unsafe_allow_html=True)
+            elif entry['status'] == 'failed':
+                st.error(f"❌ Failed to create ticket: {entry['error']}")
+            elif entry['status'] == 'review':
+                st.warning(f"⚠️ Zoho may or may not have created this ticket: {entry['error']}")
+            else:
+                retry_note = f" (retrying: {entry['error']})" if entry['error'] else ""
+                st.info(f"⏳ Queued, waiting for Zoho{retry_note}")
 
 # ----------------- SEARCH TICKETS INTERFACE -----------------
 elif menu == "🔍 Search Tickets":
@@ -240,30 +246,86 @@ elif menu == "🔍 Search Tickets":
     glass_card_box(
       "🔎 <span style='color:#1598FF;font-weight:bold;'>Enter a ticket ID</span> to search for status, add comments, or take action."
     )
-    ticket_id = st.text_input("Enter Ticket ID:", placeholder="e.g., 12345")
-    if st.button("🔍 SEARCH", use_container_width=True):
-        if ticket_id:
+    search_mode = st.radio("Search by", ["Ticket ID", "Keywords"], horizontal=True)
+    if search_mode == "Keywords":
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            query = st.text_input("Keywords:", placeholder="e.g., login error")
+        with col2:
+            status = st.selectbox("Status", ["Any", "Open", "In Progress", "On Hold", "Closed"])
+        with col3:
+            priority = st.selectbox("Priority", ["Any", "Low", "Medium", "High"])
+        if st.button("🔍 SEARCH", use_container_width=True):
             with st.spinner("Searching..."):
-                result = zoho.get_ticket(ticket_id)
-                if result['success']:
+                result = zoho.search_tickets(
+                    query,
+                    status=None if status == "Any" else status,
+                    priority=None if priority == "Any" else priority
+                )
+                if not result['success']:
+                    st.error(f"❌ {result['error']}")
+                elif not result['data']:
+                    st.info("No matching tickets.")
+                else:
+                    glass_card_box(format_ticket_summary({
+                        t.get('ticketNumber'): {'success': True, 'data': t} for t in result['data']
+                    }))
+    else:
+        ticket_id = st.text_input("Enter Ticket ID:", placeholder="e.g., 12345")
+        if st.button("🔍 SEARCH", use_container_width=True):
+            if ticket_id:
+                st.session_state.viewed_ticket = ticket_id.strip()
+                st.session_state.older_comments = []
+                st.session_state.comment_page = (None, None)
+            else:
+                st.warning("⚠️ Please enter a ticket ID")
+        viewed = st.session_state.viewed_ticket
+        if viewed:
+            # Header and newest comments are fetched in parallel; paint each as it lands.
+            # The first comment page is kept for this ticket, like older pages, so
+            # reruns (typing a comment, SEND COMMENT, Load older) don't refetch it
+            page_ticket, cached_page = st.session_state.comment_page
+            header_future, comments_future = fetch_ticket_view(
+                zoho, viewed, COMMENT_PAGE_SIZE, comments=cached_page if page_ticket == viewed else None
+            )
+            header_slot = st.empty()
+            with st.spinner("Searching..."):
+                result = header_future.result()
+            if result['success']:
+                with header_slot.container():
                     glass_card_box(format_ticket_display(result))
-                    st.markdown("### <span class='accent-title'>Actions</span>", unsafe_allow_html=True)
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        comment = st.text_area("💬 Add Comment:", placeholder="Type your comment here...")
-                    with col2:
-                        st.write("")
-                        st.write("")
-                        if st.button("📤 SEND COMMENT", use_container_width=True):
-                            if comment:
-                                result = zoho.add_comment(ticket_id, comment)
-                                if result['success']:
-                                    st.success("✅ Comment added!")
-                                else:
-                                    st.error("❌ Failed to add comment")
+                st.markdown("### <span class='accent-title'>Actions</span>", unsafe_allow_html=True)
+                col1, col2 = st.columns(2)
+                with col1:
+                    comment = st.text_area("💬 Add Comment:", placeholder="Type your comment here...")
+                with col2:
+                    st.write("")
+                    st.write("")
+                    if st.button("📤 SEND COMMENT", use_container_width=True):
+                        if comment:
+                            result = outbox.enqueue_comment(viewed, comment)
+                            if result['success']:
+                                st.success("✅ Comment queued! It will be added to the ticket shortly.")
                             else:
-                                st.warning("⚠️ Please enter a comment")
-                else:
-                    st.error(f"❌ {result['error']}")
-        else:
-            st.warning("⚠️ Please enter a ticket ID")
+                                st.error("❌ Failed to add comment")
+                        else:
+                            st.warning("⚠️ Please enter a comment")
+
+                st.markdown("### <span class='accent-title'>Conversation</span>", unsafe_allow_html=True)
+                st.write_stream(stream_comments(comments_future))
+                # Older pages are only fetched when asked for and kept for this session
+                for page in st.session_state.older_comments:
+                    st.markdown("".join(format_comment(c) for c in page))
+                first_page = comments_future.result()
+                st.session_state.comment_page = (viewed, first_page)
+                last_page = st.session_state.older_comments[-1] if st.session_state.older_comments else first_page.get('data', [])
+                if first_page['success'] and len(last_page) == COMMENT_PAGE_SIZE:
+                    def load_older_comments():
+                        page = len(st.session_state.older_comments) + 1
+                        older = zoho.get_ticket_comments(viewed, page, COMMENT_PAGE_SIZE)
+                        if older['success']:
+                            st.session_state.older_comments.append(older['data'])
+                    st.button("⬇️ Load older comments", on_click=load_older_comments)
+            else:
+                header_slot.error(f"❌ {result['error']}")
+                st.session_state.comment_page = (viewed, comments_future.result())
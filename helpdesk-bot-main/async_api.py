@@ -0,0 +1,162 @@
+import asyncio
+import time
+import httpx
+from config import get_setting
+from transport import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from token_manager import TokenManager, DEFAULT_REFRESH_MARGIN
+from ticket_cache import TicketCache
+from metrics import METRICS, endpoint_label, record_response, record_failure
+
+DEFAULT_MAX_CONCURRENCY = 50
+
+
+class AsyncZohoDeskAPI:
+    """asyncio variant of ZohoDeskAPI with the same result contract.
+
+    Requests share one pooled httpx.AsyncClient and at most
+    ``max_concurrency`` of them are in flight at once.
+    """
+
+    def __init__(self, base_url=None, max_concurrency=None, client=None, tokens=None, accounts_url=None):
+        self.base_url = base_url or get_setting("ZOHO_API_DOMAIN", "https://desk.zoho.in")
+        self.accounts_url = accounts_url or get_setting("ZOHO_ACCOUNTS_URL", "https://accounts.zoho.in/oauth/v2/token")
+        self.refresh_token = get_setting("ZOHO_REFRESH_TOKEN", "")
+        self.client_id = get_setting("ZOHO_CLIENT_ID", "")
+        self.client_secret = get_setting("ZOHO_CLIENT_SECRET", "")
+        self.org_id = get_setting("ZOHO_ORG_ID", "")
+        max_concurrency = max_concurrency or int(get_setting("ZOHO_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.client = client or httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            timeout=httpx.Timeout(
+                float(get_setting("ZOHO_READ_TIMEOUT", DEFAULT_READ_TIMEOUT)),
+                connect=float(get_setting("ZOHO_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT))
+            )
+        )
+        self.tokens = tokens or TokenManager(
+            self.fetch_access_token,
+            access_token=get_setting("ZOHO_ACCESS_TOKEN", ""),
+            refresh_margin=float(get_setting("ZOHO_TOKEN_REFRESH_MARGIN", DEFAULT_REFRESH_MARGIN)),
+            cache_file=get_setting("ZOHO_TOKEN_CACHE_FILE") or None
+        )
+        self.cache = TicketCache(
+            maxsize=int(get_setting("ZOHO_CACHE_SIZE", 1024)),
+            ttl=float(get_setting("ZOHO_CACHE_TTL", 60)),
+            negative_ttl=float(get_setting("ZOHO_CACHE_NEGATIVE_TTL", 15))
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    def fetch_access_token(self):
+        """Request a new access token; runs in a worker thread via TokenManager"""
+        try:
+            response = httpx.post(self.accounts_url, params={
+                "refresh_token": self.refresh_token,
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "grant_type": "refresh_token"
+            })
+            if response.status_code == 200:
+                return response.json()
+            return None
+        except Exception:
+            return None
+
+    async def get_token(self):
+        """Return a usable token without blocking the loop on a refresh"""
+        left = self.tokens.seconds_left()
+        if self.tokens.access_token and (left is None or left > 0):
+            return self.tokens.get_token()
+        return await asyncio.to_thread(self.tokens.get_token)
+
+    def get_headers(self, token):
+        return {
+            'Authorization': f'Zoho-oauthtoken {token}',
+            'orgId': self.org_id,
+            'Content-Type': 'application/json'
+        }
+
+    async def send(self, method, url, token, **kwargs):
+        """Send one request and record its metrics"""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.get_headers(token), **kwargs)
+        except Exception as e:
+            record_failure(method, url, started, e)
+            raise
+        record_response(method, url, started, response)
+        return response
+
+    async def make_request(self, method, url, **kwargs):
+        """Make API request with automatic token refresh"""
+        async with self.semaphore:
+            token = await self.get_token()
+            response = await self.send(method, url, token, **kwargs)
+            if response.status_code == 401 or "INVALID_OAUTH" in response.text:
+                METRICS.inc("zoho_retries_total", endpoint=endpoint_label(method, url), reason="401")
+                if await asyncio.to_thread(self.tokens.refresh, token, "401"):
+                    response = await self.send(method, url, self.tokens.access_token, **kwargs)
+            return response
+
+    async def get_ticket(self, ticket_id, modified_time=None):
+        """Fetch ticket details by ID, serving from the cache when possible"""
+        cached = self.cache.get(ticket_id)
+        if cached is None and modified_time:
+            cached = self.cache.revalidate(ticket_id, modified_time)
+        if cached is not None:
+            return cached
+        result = await self._fetch_ticket(ticket_id)
+        self.cache.put(ticket_id, result)
+        return result
+
+    async def _fetch_ticket(self, ticket_id):
+        try:
+            response = await self.make_request("GET", f"{self.base_url}/api/v1/tickets/{ticket_id}")
+            if response.status_code == 200:
+                return {'success': True, 'data': response.json()}
+            elif response.status_code == 404:
+                return {'success': False, 'error': 'Ticket not found'}
+            else:
+                return {'success': False, 'error': f'Error: {response.text}'}
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    async def create_ticket(self, subject, description, email, priority="High"):
+        """Create a new ticket"""
+        try:
+            payload = {
+                "subject": subject,
+                "description": description,
+                "contactId": email,
+                "email": email,
+                "priority": priority,
+                "status": "Open",
+                "channel": "Chat"
+            }
+            response = await self.make_request("POST", f"{self.base_url}/api/v1/tickets", json=payload)
+            if response.status_code == 200:
+                ticket = response.json()
+                self.cache.put(ticket.get('id') or ticket.get('ticketNumber'), {'success': True, 'data': ticket})
+                return {'success': True, 'data': ticket}
+            return {'success': False, 'error': f'Error: {response.text}'}
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    async def add_comment(self, ticket_id, comment):
+        """Add comment to ticket"""
+        try:
+            url = f"{self.base_url}/api/v1/tickets/{ticket_id}/comments"
+            response = await self.make_request("POST", url, json={"content": comment, "isPublic": True})
+            self.cache.invalidate(ticket_id)
+            if response.status_code == 200:
+                return {'success': True, 'data': response.json()}
+            return {'success': False, 'error': 'Failed to add comment'}
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
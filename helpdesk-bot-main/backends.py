@@ -0,0 +1,49 @@
+"""Ticket API backends, selected by ``HELPDESK_BACKEND`` (env or secrets.toml).
+
+    mock    MockZohoDeskAPI, in-memory sample data (default)
+    live    ZohoDeskAPI against Zoho Desk
+    mirror  ZohoDeskAPI answering reads from the SQLite mirror at
+            ZOHO_MIRROR_PATH (kept fresh by ``python ticket_mirror.py``)
+
+Each factory imports its client module on first use, so the app only
+pays for the HTTP stack when it actually talks to Zoho.
+"""
+from config import get_setting
+
+DEFAULT_BACKEND = "mock"
+
+
+def _mock():
+    from mock_api import MockZohoDeskAPI
+    return MockZohoDeskAPI()
+
+
+def _live():
+    from zoho_api import ZohoDeskAPI
+    return ZohoDeskAPI()
+
+
+def _mirror():
+    from zoho_api import ZohoDeskAPI
+    from ticket_mirror import TicketMirror
+    return ZohoDeskAPI(mirror=TicketMirror(get_setting("ZOHO_MIRROR_PATH", ".cache/tickets.sqlite3")))
+
+
+BACKENDS = {
+    "mock": _mock,
+    "live": _live,
+    "mirror": _mirror,
+}
+
+
+def register_backend(name, factory):
+    """Make ``factory()`` available as ``HELPDESK_BACKEND=name``"""
+    BACKENDS[name] = factory
+
+
+def create_api(name=None):
+    """Build the ticket API client for ``name`` or the configured backend"""
+    name = name or get_setting("HELPDESK_BACKEND", DEFAULT_BACKEND)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown HELPDESK_BACKEND: {name} (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
@@ -0,0 +1,260 @@
+"""Reproducible benchmarks for the bot's request path.
+
+Measures throughput and p50/p95/p99 latency for chat routing, ticket
+rendering, the API clients (against a local MockDeskServer) and app
+startup/rerun cost, and emits the results as JSON:
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --baseline results.json --threshold 0.15
+    python benchmarks/run_benchmarks.py --transcript chats.jsonl --only routing
+    python benchmarks/run_benchmarks.py --only startup
+
+With ``--baseline`` the run exits non-zero if any scenario's p95 grew by
+more than ``--threshold`` (a fraction) compared to the baseline file.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from bot import ROUTER, process_message  # noqa: E402
+from formatting import format_ticket_display  # noqa: E402
+from mock_api import MockZohoDeskAPI, FaultInjector, fixed_latency  # noqa: E402
+
+DEFAULT_MESSAGES = [
+    "what is the status of 12345",
+    "check 12345 67890 11111 please",
+    "I want to create a new ticket",
+    "help",
+    "hello there",
+    "ticket 99999 is not loading",
+]
+CONCURRENCY_LEVELS = (1, 8, 32)
+STARTUP_BACKENDS = ("mock", "live", "mirror")
+STARTUP_CODE = (
+    "import time; started = time.perf_counter(); import backends; backends.create_api({backend!r}); "
+    "print((time.perf_counter() - started) * 1000)"
+)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(name, func, inputs, concurrency=1):
+    """Run ``func`` over ``inputs`` and summarise per-call latency in ms"""
+    def timed(arg):
+        start = time.perf_counter()
+        func(arg)
+        return (time.perf_counter() - start) * 1000
+
+    wall = time.perf_counter()
+    if concurrency == 1:
+        latencies = [timed(arg) for arg in inputs]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, inputs))
+    wall = time.perf_counter() - wall
+    return summarise(name, latencies, wall, concurrency)
+
+
+def summarise(name, latencies, wall, concurrency=1):
+    latencies = sorted(latencies)
+    return {
+        "name": name,
+        "calls": len(latencies),
+        "concurrency": concurrency,
+        "throughput_per_s": len(latencies) / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def load_transcript(path):
+    """Read chat messages from a JSONL file (``body``/``message``/``content``)"""
+    messages = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            text = record.get("body") or record.get("message") or record.get("content") or record.get("title")
+            if text:
+                messages.append(text)
+    return messages
+
+
+def bench_routing(messages, iterations):
+    api = MockZohoDeskAPI()
+    inputs = list(itertools.islice(itertools.cycle(messages), iterations))
+    return [
+        # Intent/entity matching alone, without handler I/O
+        measure("intent_router.parse", ROUTER.parse, inputs),
+        measure("process_message", lambda m: process_message(m, api), inputs),
+    ]
+
+
+def bench_rendering(iterations):
+    api = MockZohoDeskAPI(seed_tickets=1000, seed=1)
+    results = [api.get_ticket(t) for t in itertools.islice(itertools.cycle(api.tickets), iterations)]
+    return [measure("format_ticket_display", format_ticket_display, results)]
+
+
+def _client_calls(api, prefix, ticket_ids, iterations, concurrency):
+    ids = list(itertools.islice(itertools.cycle(ticket_ids), iterations))
+    return [
+        measure(f"{prefix}.get_ticket", api.get_ticket, ids, concurrency),
+        measure(f"{prefix}.create_ticket",
+                lambda n: api.create_ticket(f"Benchmark ticket {n}", "created by benchmark", "bench@example.com"),
+                range(iterations), concurrency),
+        measure(f"{prefix}.add_comment", lambda t: api.add_comment(t, "benchmark comment"), ids, concurrency),
+    ]
+
+
+def bench_clients(iterations, latency_ms, tickets):
+    from mock_server import MockDeskServer
+    from retry import TokenBucket
+    from zoho_api import ZohoDeskAPI
+
+    results = []
+    # In-process mock with the same latency model as the server
+    for concurrency in CONCURRENCY_LEVELS:
+        mock = MockZohoDeskAPI(seed_tickets=tickets, seed=1, cache_size=0,
+                               faults=FaultInjector(latency=fixed_latency(latency_ms), seed=1))
+        ids = list(itertools.islice(mock.tickets, tickets))
+        results.extend(_client_calls(mock, "MockZohoDeskAPI", ids, iterations, concurrency))
+
+    server = MockDeskServer(
+        ("127.0.0.1", 0),
+        api=MockZohoDeskAPI(seed_tickets=tickets, seed=1, cache_size=0),
+        faults=FaultInjector(latency=fixed_latency(latency_ms), seed=1)
+    ).start()
+    ids = list(itertools.islice(server.api.tickets, tickets))
+    os.environ["ZOHO_CACHE_SIZE"] = "0"
+    try:
+        for concurrency in CONCURRENCY_LEVELS:
+            api = ZohoDeskAPI(base_url=server.url, accounts_url=f"{server.url}/oauth/v2/token")
+            # The process-wide org bucket (10 req/s by default) would turn
+            # these rows into a measurement of its queue, not of the client
+            api.limiter = TokenBucket(0, 1)
+            results.extend(_client_calls(api, "ZohoDeskAPI", ids, iterations, concurrency))
+            api.transport.close()
+    finally:
+        os.environ.pop("ZOHO_CACHE_SIZE", None)
+        server.shutdown()
+    return results
+
+
+def bench_startup(iterations):
+    """Import and client construction per backend in fresh interpreters,
+    then the Streamlit first run and reruns of app.py when streamlit is
+    installed"""
+    results = []
+    env = dict(os.environ, ZOHO_MIRROR_PATH=os.path.join(tempfile.mkdtemp(), "mirror.sqlite3"))
+    for backend in STARTUP_BACKENDS:
+        latencies = []
+        wall = time.perf_counter()
+        for _ in range(iterations):
+            proc = subprocess.run([sys.executable, "-c", STARTUP_CODE.format(backend=backend)],
+                                  cwd=APP_DIR, env=env, capture_output=True, text=True)
+            if proc.returncode != 0:
+                reason = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+                print(f"startup.{backend}: skipped ({reason})", file=sys.stderr)
+                break
+            latencies.append(float(proc.stdout.split()[-1]))
+        else:
+            results.append(summarise(f"startup.{backend}", latencies, time.perf_counter() - wall))
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        print("app.first_run/app.rerun: skipped (streamlit not installed)", file=sys.stderr)
+        return results
+    # Streamlit re-executes app.py top to bottom on every interaction
+    app = AppTest.from_file(os.path.join(APP_DIR, "app.py"), default_timeout=60)
+    results.append(measure("app.first_run", lambda _: app.run(), [None]))
+    results.append(measure("app.rerun", lambda _: app.run(), range(iterations)))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return scenarios whose p95 regressed by more than ``threshold``"""
+    previous = {(r["name"], r["concurrency"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["name"], result["concurrency"]))
+        if not before or not before["p95_ms"]:
+            continue
+        change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"]
+        if change > threshold:
+            regressions.append({
+                "name": result["name"],
+                "concurrency": result["concurrency"],
+                "baseline_p95_ms": before["p95_ms"],
+                "p95_ms": result["p95_ms"],
+                "change": change
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the helpdesk bot request path")
+    parser.add_argument("--only", choices=["routing", "rendering", "clients", "startup"], action="append")
+    parser.add_argument("--iterations", type=int, default=2000, help="calls per routing/rendering scenario")
+    parser.add_argument("--client-iterations", type=int, default=200, help="calls per client scenario")
+    parser.add_argument("--startup-iterations", type=int, default=10, help="cold starts / reruns per startup scenario")
+    parser.add_argument("--latency-ms", type=float, default=5, help="simulated Zoho latency")
+    parser.add_argument("--tickets", type=int, default=1000, help="synthetic tickets in the stand-in")
+    parser.add_argument("--transcript", help="JSONL chat transcript to replay through process_message")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="JSON results from a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed p95 regression (fraction)")
+    args = parser.parse_args()
+
+    scenarios = args.only or ["routing", "rendering", "clients", "startup"]
+    messages = load_transcript(args.transcript) if args.transcript else DEFAULT_MESSAGES
+    results = []
+    if "routing" in scenarios:
+        results.extend(bench_routing(messages, args.iterations))
+    if "rendering" in scenarios:
+        results.extend(bench_rendering(args.iterations))
+    if "clients" in scenarios:
+        results.extend(bench_clients(args.client_iterations, args.latency_ms, args.tickets))
+    if "startup" in scenarios:
+        results.extend(bench_startup(args.startup_iterations))
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": results
+    }
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(results, json.load(f), args.threshold)
+        exit_code = 1 if report["regressions"] else 0
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
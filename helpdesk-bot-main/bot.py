@@ -0,0 +1,226 @@
+"""Chat message handling, kept free of Streamlit so it can be benchmarked"""
+import argparse
+import json
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from chat_history import remember_rendering, get_rendering
+from formatting import format_ticket_display, format_ticket_summary, format_comment
+from intent_router import IntentRouter
+
+TICKET_ID_RE = re.compile(r'\b\d{5,}\b')
+# Writes only run on an explicit command at the start of the message, so
+# questions that merely mention a ticket never post to it
+COMMENT_COMMAND = r'^\s*(?:add\s+(?:a\s+)?)?(?:comment|note)\s+(?:on|to)\s+(?:ticket\s+)?#?(\d{5,})\s*:'
+ESCALATE_COMMAND = r'^\s*escalate\s+(?:ticket\s+)?#?(\d{5,})\b'
+COMMENT_RE = re.compile(COMMENT_COMMAND + r'(.*)', re.IGNORECASE | re.DOTALL)
+ESCALATE_RE = re.compile(ESCALATE_COMMAND + r'[\s:,.-]*(.*)', re.IGNORECASE | re.DOTALL)
+
+ROUTER = IntentRouter()
+ROUTER.entity("ticket_id", TICKET_ID_RE.pattern)
+ROUTER.entity("email", r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+ROUTER.entity("priority", r'\b(?:high|medium|low)\b')
+ROUTER.entity("status", r'\b(?:open|closed|on\s+hold|in\s+progress)\b')
+
+COMMENT_PAGE_SIZE = 20
+VIEW_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ticket-view")
+
+# English stopwords plus chat filler; none of them narrows a search
+FILLER_WORDS = frozenset("""
+    a about above after again all am an and any are as at be because been before being below between both
+    but by can could did do does doing down during each few for from further had has have having he her
+    here hers him his how i if in into is it its just me more most my no nor not now of off on once only
+    or other our ours out over own same she should so some such than that the their theirs them then there
+    these they this those through to too under until up very was we were what when where which while who
+    whom why will with would you your yours
+    any anything everything show list give get see find tell let lets want need like please thanks thank
+    hi hello hey ticket tickets priority status issue issues one ones
+""".split())
+
+HELP_TEXT = """
+        I can help you with:
+
+        <span style="color:#1598FF;font-weight:bold;">1️⃣ Check Ticket Status</span> - Just type or paste your ticket ID  
+        <span style="color:#1598FF;font-weight:bold;">2️⃣ Create New Ticket</span> - Use the sidebar menu  
+        <span style="color:#1598FF;font-weight:bold;">3️⃣ Search Tickets</span> - Type "search" and some keywords, e.g. <span style='color:#FF914D'>search login error high</span>  
+        <span style="color:#1598FF;font-weight:bold;">4️⃣ Comment</span> - e.g. <span style='color:#FF914D'>comment on 12345: works now</span>  
+        <span style="color:#1598FF;font-weight:bold;">5️⃣ Escalate</span> - e.g. <span style='color:#FF914D'>escalate 12345</span>  
+        
+        Try typing a ticket ID like: <span style='color:#FF914D'>12345</span>
+        """
+
+def rendering_key(results):
+    """Key a ticket rendering by the IDs and modifiedTime it was built from"""
+    return "tickets:" + ",".join(
+        f"{ticket_id}@{result['data'].get('modifiedTime', '') if result['success'] else result['error']}"
+        for ticket_id, result in results.items()
+    )
+
+def _free_text(parsed):
+    return " ".join(w for w in parsed.rest.split() if w.lower().strip(":,.?!") not in FILLER_WORDS)
+
+def _canonical(value):
+    return " ".join(value.split()).title()
+
+@ROUTER.intent("status", keywords=("status", "check ticket", "track"), triggers=("ticket_id",))
+def handle_status(parsed, api, outbox=None):
+    ticket_ids = parsed.entities.get("ticket_id", [])
+    if not ticket_ids:
+        return "text", "Which ticket? Type or paste its ID, e.g. 12345."
+    if len(ticket_ids) > 1:
+        results = api.get_tickets(ticket_ids)
+        key = rendering_key(results)
+        if get_rendering(key) is None:
+            remember_rendering(key, format_ticket_summary(results))
+        return "ticket", (tuple(ticket_ids), key)
+    result = api.get_ticket(ticket_ids[0])
+    if not result['success']:
+        return "text", f"❌ {result['error']}"
+    key = rendering_key({ticket_ids[0]: result})
+    if get_rendering(key) is None:
+        remember_rendering(key, format_ticket_display(result))
+    return "ticket", (tuple(ticket_ids), key)
+
+# "show/list ... tickets" with words in between; the lookahead leaves those
+# words to the entity matchers, e.g. "list high priority tickets"
+LIST_COMMAND = r'\b(?:show|list)\b(?=(?:\s+[\w-]+){0,5}?\s+tickets\b)'
+
+@ROUTER.intent("search", keywords=("search", "find", "look for"), patterns=(LIST_COMMAND,), priority=1)
+def handle_search(parsed, api, outbox=None):
+    query = _free_text(parsed)
+    if parsed.entities.get("ticket_id") and not query:
+        return handle_status(parsed, api)
+    status = parsed.entities.get("status")
+    priority = parsed.entities.get("priority")
+    if not query and not status and not priority:
+        return "text", "What should I search for? e.g. <span style='color:#FF914D'>search login error high</span>"
+    result = api.search_tickets(
+        query,
+        status=_canonical(status[0]) if status else None,
+        priority=_canonical(priority[0]) if priority else None,
+        limit=10
+    )
+    if not result['success']:
+        return "text", f"❌ {result['error']}"
+    if not result['data']:
+        return "text", "🔍 No tickets matched your search."
+    results = {str(t.get('ticketNumber') or t.get('id')): {'success': True, 'data': t} for t in result['data']}
+    return "text", format_ticket_summary(results)
+
+@ROUTER.intent("comment", patterns=(COMMENT_COMMAND,), priority=2)
+def handle_comment(parsed, api, outbox=None):
+    ticket_id, comment = COMMENT_RE.match(parsed.text).groups()
+    comment = comment.strip()
+    if not comment:
+        return "text", "To comment, add the text after the colon, e.g. <span style='color:#FF914D'>comment on 12345: works now</span>"
+    return _queue_comment(outbox, ticket_id, comment, f"💬 Comment queued for ticket #{ticket_id}.")
+
+@ROUTER.intent("escalate", patterns=(ESCALATE_COMMAND,), priority=3)
+def handle_escalate(parsed, api, outbox=None):
+    ticket_id, reason = ESCALATE_RE.match(parsed.text).groups()
+    reason = reason.strip()
+    comment = "Escalation requested via helpdesk chat" + (f": {reason}" if reason else "")
+    return _queue_comment(outbox, ticket_id, comment,
+                          f"🚨 Escalation requested for ticket #{ticket_id}. The support team has been notified.")
+
+def _queue_comment(outbox, ticket_id, comment, confirmation):
+    if outbox is None:
+        return "text", "❌ Comments can't be sent from chat right now; use 🔍 Search Tickets instead."
+    result = outbox.enqueue_comment(ticket_id, comment)
+    if not result['success']:
+        return "text", "❌ Failed to queue the comment"
+    return "text", confirmation
+
+@ROUTER.intent("create", keywords=("create", "new ticket"))
+def handle_create(parsed, api, outbox=None):
+    return "text", "Please use the '🆕 Create Ticket' option in the sidebar to create a new ticket."
+
+@ROUTER.intent("help", keywords=("help",), priority=-1)
+def handle_help(parsed, api, outbox=None):
+    return "text", HELP_TEXT
+
+@ROUTER.intent("fallback")
+def handle_fallback(parsed, api, outbox=None):
+    return "text", "I didn't quite understand that. You can:<br>- Type a ticket ID to check status<br>- Type 'help' for more options<br>- Use the sidebar menu for other actions"
+
+ROUTER.compile()
+
+def process_message(user_input, api, outbox=None):
+    """Answer a chat message with a compact ``(kind, payload)`` record.
+
+    Comments and escalations are queued on ``outbox``; without one the
+    bot only reads.
+    """
+    return ROUTER.route(user_input, api, outbox)
+
+def render_record(kind, payload, api):
+    """Turn a history record back into markdown"""
+    if kind == "text":
+        return payload
+    ticket_ids, key = payload
+    markdown = get_rendering(key)
+    if markdown is None:
+        markdown = render_record(*process_message(" ".join(ticket_ids), api), api)
+    return markdown
+
+def fetch_ticket_view(api, ticket_id, limit=COMMENT_PAGE_SIZE, comments=None):
+    """Start fetching a ticket header and its newest comment page concurrently.
+
+    Returns ``(header_future, comments_future)`` so the caller can paint
+    the header as soon as it arrives; older pages are fetched separately
+    with ``api.get_ticket_comments(ticket_id, page)`` when asked for.
+    ``comments`` is a first page fetched earlier (e.g. kept across
+    Streamlit reruns) and is reused instead of calling the API again.
+    """
+    if comments is None:
+        comments_future = VIEW_POOL.submit(api.get_ticket_comments, ticket_id, 0, limit)
+    else:
+        comments_future = Future()
+        comments_future.set_result(comments)
+    return VIEW_POOL.submit(api.get_ticket, ticket_id), comments_future
+
+def stream_comments(comments_future):
+    """Yield rendered comments once the page arrives, for ``st.write_stream``"""
+    result = comments_future.result()
+    if not result['success']:
+        yield f"⚠️ Could not load comments: {result['error']}"
+        return
+    if not result['data']:
+        yield "_No comments yet._"
+    for comment in result['data']:
+        yield format_comment(comment)
+
+def evaluate(path):
+    """Route a JSONL corpus offline; lines look like {"message": ..., "intent": ...}"""
+    with open(path) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    started = time.perf_counter()
+    parsed = ROUTER.route_many([row["message"] for row in rows])
+    elapsed = time.perf_counter() - started
+    counts = {}
+    labelled = correct = 0
+    mistakes = []
+    for row, p in zip(rows, parsed):
+        counts[p.intent] = counts.get(p.intent, 0) + 1
+        if "intent" in row:
+            labelled += 1
+            if row["intent"] == p.intent:
+                correct += 1
+            else:
+                mistakes.append({"message": row["message"], "expected": row["intent"], "got": p.intent})
+    return {
+        "messages": len(rows),
+        "messages_per_second": round(len(rows) / elapsed) if elapsed else None,
+        "intents": counts,
+        "accuracy": round(correct / labelled, 4) if labelled else None,
+        "mistakes": mistakes
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate intent routing over a JSONL corpus")
+    parser.add_argument("corpus", help='JSONL file of {"message": ..., "intent": ...} lines')
+    args = parser.parse_args()
+    print(json.dumps(evaluate(args.corpus), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""Bulk ticket creation from CSV or JSONL exports.
+
+    python bulk_import.py outage.csv --report outage-report.csv --rate 5
+
+Rows need ``email``, ``subject`` and ``description`` (the Create Ticket
+form's required fields) and may set ``priority``. The file is parsed as
+a stream, rows repeating an earlier subject + email are skipped, and the
+rest are created by a pool of workers sharing a token bucket.
+
+Progress is checkpointed to SQLite next to the report, so re-running the
+same command after a crash or Ctrl-C resumes where it stopped: rows that
+were created, skipped or invalid are not submitted again, and rows Zoho
+rejected without acting on them are retried. Each row is committed as
+``submitted`` before it is sent; rows still ``submitted`` after a crash
+(up to ``workers * 4`` of them) may or may not exist in Zoho, so they are
+reported as ``review`` instead of being created again.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from retry import TokenBucket, classify_failure
+
+REVIEW_NOTE = "Outcome unknown; check Zoho before resubmitting"
+REQUIRED_FIELDS = ("email", "subject", "description")
+PRIORITIES = ("Low", "Medium", "High")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rows (
+    row INTEGER PRIMARY KEY,
+    dedupe_key TEXT,
+    status TEXT NOT NULL,
+    ticket_number TEXT,
+    error TEXT
+);
+"""
+
+
+def validate_ticket(email, subject, description, priority="High"):
+    """Return an error message for a ticket submission, or None if valid"""
+    fields = {"email": email, "subject": subject, "description": description}
+    missing = [name for name in REQUIRED_FIELDS if not (fields[name] or "").strip()]
+    if missing:
+        return f"Missing required fields: {', '.join(missing)}"
+    if priority not in PRIORITIES:
+        return f"Priority must be one of {', '.join(PRIORITIES)}"
+    return None
+
+
+def dedupe_key(subject, email):
+    normalized = f"{' '.join(subject.lower().split())}\0{email.strip().lower()}"
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def iter_rows(stream, fmt):
+    """Yield ``(row_number, row, error)`` from a text stream without reading
+    it whole; ``fmt`` is ``csv`` or ``jsonl``"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for number, row in enumerate(reader, start=1):
+            yield number, {k.strip().lower(): (v or "") for k, v in row.items() if k}, None
+        return
+    number = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield number, None, "Expected a JSON object"
+            continue
+        yield number, {str(k).lower(): "" if v is None else str(v) for k, v in row.items()}, None
+
+
+def file_fingerprint(stream, chunk_size=1 << 20):
+    """Content hash of a binary stream, used to resume re-uploaded files"""
+    digest = hashlib.sha1()
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def detect_format(name):
+    return "jsonl" if name.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+class BulkImporter:
+    """Creates tickets from parsed rows with bounded concurrency.
+
+    At most ``workers * 4`` rows are in flight, so memory stays flat for
+    large files. A row is committed as ``submitted`` (together with any
+    results gathered so far) before it is handed to a worker; other
+    results are committed at least every ``checkpoint_every`` rows.
+    """
+
+    def __init__(self, api, checkpoint_path, workers=8, rate=5, burst=None, checkpoint_every=100):
+        self.api = api
+        self.checkpoint_path = checkpoint_path
+        self.workers = workers
+        self.limiter = TokenBucket(rate, burst or max(1, workers))
+        self.checkpoint_every = checkpoint_every
+        if os.path.dirname(checkpoint_path):
+            os.makedirs(os.path.dirname(checkpoint_path), exist_ok=True)
+        self.db = sqlite3.connect(checkpoint_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def _create(self, row):
+        self.limiter.acquire()
+        try:
+            return self.api.create_ticket(row["subject"], row["description"], row["email"], row["priority"])
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    def run(self, rows, progress=None):
+        """Import ``(row_number, row, error)`` tuples; returns status counts.
+
+        ``progress(rows_seen, counts)`` is called after each checkpoint.
+        """
+        with self.db:
+            # Rows in flight when the last run died may already exist in Zoho
+            interrupted = {number for number, in self.db.execute("SELECT row FROM rows WHERE status = 'submitted'")}
+            self.db.execute("UPDATE rows SET status = 'review', error = ? WHERE status = 'submitted'", (REVIEW_NOTE,))
+        done = {}
+        claimed = {}
+        for number, key, status in self.db.execute("SELECT row, dedupe_key, status FROM rows"):
+            if status != "failed":
+                done[number] = status
+            if status in ("created", "review"):
+                claimed[key] = number
+        counts = {"created": 0, "duplicate": 0, "invalid": 0, "failed": 0, "review": 0, "resumed": 0}
+        pending = {}
+        results = []
+        seen = 0
+        unsaved = 0
+
+        def checkpoint():
+            nonlocal unsaved
+            self._checkpoint(results)
+            unsaved = 0
+            if progress:
+                progress(seen, counts)
+
+        def record(number, key, status, ticket_number=None, error=None):
+            nonlocal unsaved
+            counts[status] += 1
+            results.append((number, key, status, ticket_number, error))
+            unsaved += 1
+            if unsaved >= self.checkpoint_every:
+                checkpoint()
+
+        def collect(futures):
+            for future in futures:
+                number, key = pending.pop(future)
+                result = future.result()
+                if result['success']:
+                    record(number, key, "created", str(result['data'].get('ticketNumber') or result['data'].get('id')))
+                elif classify_failure(result) == "unknown":
+                    record(number, key, "review", error=f"{result['error']} ({REVIEW_NOTE})")
+                else:
+                    claimed.pop(key, None)
+                    record(number, key, "failed", error=result['error'])
+
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk-import")
+        try:
+            for number, row, error in rows:
+                seen += 1
+                if number in done:
+                    counts["review" if number in interrupted else "resumed"] += 1
+                    continue
+                if error is None:
+                    row = dict(row, priority=(row.get("priority") or "High").strip().capitalize())
+                    error = validate_ticket(row.get("email"), row.get("subject"), row.get("description"),
+                                            row["priority"])
+                if error:
+                    record(number, None, "invalid", error=error)
+                    continue
+                key = dedupe_key(row["subject"], row["email"])
+                if key in claimed:
+                    record(number, key, "duplicate", error=f"Duplicate of row {claimed[key]}")
+                    continue
+                claimed[key] = number
+                # Durable before Zoho sees it, so a crash cannot lead to a resend
+                results.append((number, key, "submitted", None, None))
+                self._checkpoint(results)
+                pending[pool.submit(self._create, row)] = (number, key)
+                if len(pending) >= self.workers * 4:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(finished)
+        finally:
+            # Let in-flight rows finish so they are checkpointed even on Ctrl-C
+            pool.shutdown(wait=True)
+            collect(list(pending))
+            self._checkpoint(results)
+        if progress:
+            progress(seen, counts)
+        return counts
+
+    def _checkpoint(self, results):
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO rows (row, dedupe_key, status, ticket_number, error) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(row) DO UPDATE SET status = excluded.status, "
+                "ticket_number = excluded.ticket_number, error = excluded.error",
+                results
+            )
+        results.clear()
+
+    def write_report(self, stream):
+        """Write one CSV line per row: row, status, ticket_number, error.
+
+        ``review`` rows may or may not have been created in Zoho.
+        """
+        writer = csv.writer(stream)
+        writer.writerow(["row", "status", "ticket_number", "error"])
+        writer.writerows(self.db.execute("SELECT row, status, ticket_number, error FROM rows ORDER BY row"))
+
+    def close(self):
+        self.db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create Zoho Desk tickets from a CSV or JSONL file")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="defaults to the file extension")
+    parser.add_argument("--report", help="per-row CSV report (default: <path>.report.csv)")
+    parser.add_argument("--checkpoint", help="resume database (default: <report>.checkpoint.sqlite3)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=5, help="tickets per second; 0 for no limit")
+    parser.add_argument("--mock", action="store_true", help="create tickets in MockZohoDeskAPI instead of Zoho")
+    args = parser.parse_args()
+
+    if args.mock:
+        from mock_api import MockZohoDeskAPI
+        api = MockZohoDeskAPI(cache_size=0)
+    else:
+        from zoho_api import ZohoDeskAPI
+        api = ZohoDeskAPI()
+    report = args.report or f"{args.path}.report.csv"
+    importer = BulkImporter(api, args.checkpoint or f"{report}.checkpoint.sqlite3",
+                            workers=args.workers, rate=args.rate)
+    started = time.time()
+
+    def progress(seen, counts):
+        print(f"\r{seen} rows read, {counts['created']} created, {counts['failed']} failed, "
+              f"{counts['review']} to review", end="", flush=True)
+
+    try:
+        with open(args.path, newline="", encoding="utf-8-sig") as f:
+            counts = importer.run(iter_rows(f, args.format or detect_format(args.path)), progress)
+    finally:
+        with open(report, "w", newline="") as f:
+            importer.write_report(f)
+        importer.close()
+    print(f"\nDone in {time.time() - started:.1f}s: {json.dumps(counts)}; report written to {report}")
+
+
+if __name__ == "__main__":
+    main()
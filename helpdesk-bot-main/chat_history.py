@@ -0,0 +1,67 @@
+import threading
+from collections import OrderedDict, deque
+from itertools import islice
+
+MAX_RENDERINGS = 2048
+
+_renderings = OrderedDict()
+_lock = threading.Lock()
+
+
+def remember_rendering(key, markdown):
+    """Store rendered markdown in the process-wide LRU and return its key"""
+    with _lock:
+        _renderings[key] = markdown
+        _renderings.move_to_end(key)
+        while len(_renderings) > MAX_RENDERINGS:
+            _renderings.popitem(last=False)
+    return key
+
+
+def get_rendering(key):
+    """Return previously rendered markdown, or None if it was evicted"""
+    with _lock:
+        markdown = _renderings.get(key)
+        if markdown is not None:
+            _renderings.move_to_end(key)
+        return markdown
+
+
+class ChatHistory:
+    """Bounded per-session chat log of compact records.
+
+    Each record is ``(role, kind, payload)``. Text messages keep their text;
+    ticket replies keep only the ticket IDs and a key into the shared
+    rendering cache. The oldest records are dropped once either
+    ``max_messages`` or roughly ``max_bytes`` of payload is exceeded.
+    """
+
+    def __init__(self, max_messages=500, max_bytes=256 * 1024):
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.records = deque()
+        self.size = 0
+
+    def __len__(self):
+        return len(self.records)
+
+    @staticmethod
+    def _size(payload):
+        if isinstance(payload, str):
+            return len(payload)
+        ticket_ids, key = payload
+        return sum(len(t) for t in ticket_ids) + len(key)
+
+    def append(self, role, kind, payload):
+        self.records.append((role, kind, payload))
+        self.size += self._size(payload)
+        while self.records and (len(self.records) > self.max_messages or self.size > self.max_bytes):
+            _, _, old = self.records.popleft()
+            self.size -= self._size(old)
+
+    def add_text(self, role, text):
+        self.append(role, "text", text)
+
+    def tail(self, count):
+        """Return the last ``count`` records, oldest first"""
+        return list(islice(reversed(self.records), count))[::-1]
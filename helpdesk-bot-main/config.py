@@ -0,0 +1,17 @@
+import os
+
+
+def get_setting(key, default=None):
+    """Read a setting from the environment, then Streamlit secrets.
+
+    Lets the API clients run outside Streamlit (async workers, the Catalyst
+    function) where ``st.secrets`` is unavailable.
+    """
+    value = os.environ.get(key)
+    if value is not None:
+        return value
+    try:
+        import streamlit as st
+        return st.secrets.get(key, default)
+    except Exception:
+        return default
@@ -0,0 +1,75 @@
+"""Markdown rendering of tickets and comments, shared by every backend.
+
+Templates and emoji tables are module constants, built once per process
+rather than on every call or Streamlit rerun.
+"""
+
+STATUS_EMOJI = {'Open': '🔴', 'In Progress': '🟡', 'On Hold': '🟠', 'Closed': '🟢'}
+PRIORITY_EMOJI = {'High': '🔥', 'Medium': '⚠️', 'Low': '📌'}
+
+TICKET_TEMPLATE = """
+### 📋 Ticket Details
+
+**Ticket ID:** #{number}
+
+**Status:** {status_emoji} {status}
+
+**Priority:** {priority_emoji} {priority}
+
+**Subject:** {subject}
+
+**Created:** {created}
+
+**Last Updated:** {modified}
+
+**Assigned To:** {assignee}
+
+---
+"""
+
+SUMMARY_HEADER = "| Ticket | Status | Priority | Subject | Assigned To |\n|---|---|---|---|---|"
+COMMENT_TEMPLATE = "**{author}** · {time}{visibility}\n\n{content}\n\n---\n\n"
+
+
+def format_ticket_display(ticket_data):
+    """Format ticket data for display"""
+    ticket = ticket_data.get('data', {})
+    return TICKET_TEMPLATE.format(
+        number=ticket.get('ticketNumber', 'N/A'),
+        status_emoji=STATUS_EMOJI.get(ticket.get('status'), '⚪'),
+        status=ticket.get('status', 'Unknown'),
+        priority_emoji=PRIORITY_EMOJI.get(ticket.get('priority'), '📌'),
+        priority=ticket.get('priority', 'Normal'),
+        subject=ticket.get('subject', 'No subject'),
+        created=ticket.get('createdTime', 'N/A'),
+        modified=ticket.get('modifiedTime', 'N/A'),
+        assignee=(ticket.get('assignee') or {}).get('name', 'Unassigned')
+    )
+
+
+def format_ticket_summary(results):
+    """Format several get_ticket results as a compact markdown table"""
+    rows = [SUMMARY_HEADER]
+    for ticket_id, result in results.items():
+        if not result['success']:
+            rows.append(f"| #{ticket_id} | ❌ {result['error']} | | | |")
+            continue
+        ticket = result['data']
+        subject = str(ticket.get('subject', 'No subject')).replace('|', '\\|')
+        rows.append(
+            f"| #{ticket.get('ticketNumber', ticket_id)} "
+            f"| {STATUS_EMOJI.get(ticket.get('status'), '⚪')} {ticket.get('status', 'Unknown')} "
+            f"| {ticket.get('priority', 'Normal')} "
+            f"| {subject} "
+            f"| {(ticket.get('assignee') or {}).get('name', 'Unassigned')} |"
+        )
+    return "\n".join(rows)
+
+
+def format_comment(comment):
+    return COMMENT_TEMPLATE.format(
+        author=(comment.get('commenter') or {}).get('name', 'Unknown'),
+        time=comment.get('commentedTime', ''),
+        visibility="" if comment.get('isPublic', True) else " 🔒",
+        content=comment.get('content', '')
+    )
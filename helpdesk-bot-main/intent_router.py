@@ -0,0 +1,95 @@
+import re
+from collections import namedtuple
+
+Intent = namedtuple("Intent", "name keywords patterns triggers priority handler")
+Parsed = namedtuple("Parsed", "text intent entities rest")
+
+
+class IntentRouter:
+    """Declarative intent and entity matcher compiled into one regex.
+
+    Intents are registered with keywords, extra regex patterns and/or the
+    entities that trigger them; entities are named regexes. ``compile()``
+    folds everything into a single alternation of named groups, so parsing
+    a message is one ``finditer`` pass however many intents exist.
+    """
+
+    def __init__(self, fallback="fallback"):
+        self.fallback = fallback
+        self.intents = {}
+        self.entities = {}
+        self._regex = None
+        self._groups = {}
+
+    def entity(self, name, pattern):
+        self.entities[name] = pattern
+        self._regex = None
+
+    def intent(self, name, keywords=(), patterns=(), triggers=(), priority=0):
+        """Decorator registering ``handler(parsed, *context)`` for an intent"""
+        def register(handler):
+            self.intents[name] = Intent(name, tuple(keywords), tuple(patterns), tuple(triggers), priority, handler)
+            self._regex = None
+            return handler
+        return register
+
+    def compile(self):
+        groups = {}
+        parts = []
+        # Entities come first so e.g. an email is not split by a keyword match
+        for n, (name, pattern) in enumerate(self.entities.items()):
+            groups[f"e{n}"] = ("entity", name)
+            parts.append(f"(?P<e{n}>{pattern})")
+        for n, intent in enumerate(self.intents.values()):
+            alternatives = [r"\b" + re.escape(k).replace(r"\ ", r"\s+") + r"\b" for k in intent.keywords]
+            alternatives.extend(intent.patterns)
+            if alternatives:
+                groups[f"i{n}"] = ("intent", intent.name)
+                parts.append(f"(?P<i{n}>{'|'.join(alternatives)})")
+        self._regex = re.compile("|".join(parts) or r"(?!)", re.IGNORECASE)
+        self._groups = groups
+        return self
+
+    def parse(self, text):
+        """Return the winning intent, extracted entities and leftover text.
+
+        ``rest`` is ``text`` with every keyword and entity match removed,
+        for handlers that need free text such as a search query.
+        """
+        if self._regex is None:
+            self.compile()
+        entities = {}
+        hits = set()
+        rest = []
+        end = 0
+        for match in self._regex.finditer(text):
+            rest.append(text[end:match.start()])
+            end = match.end()
+            kind, name = self._groups[match.lastgroup]
+            if kind == "entity":
+                values = entities.setdefault(name, [])
+                value = match.group()
+                if value not in values:
+                    values.append(value)
+            else:
+                hits.add(name)
+        rest.append(text[end:])
+        best = None
+        for intent in self.intents.values():
+            if intent.name in hits or any(t in entities for t in intent.triggers):
+                if best is None or intent.priority > best.priority:
+                    best = intent
+        return Parsed(text, best.name if best else self.fallback, entities, " ".join("".join(rest).split()))
+
+    def route(self, text, *context):
+        """Parse ``text`` and call the winning handler with ``context``
+        (e.g. the API client)"""
+        parsed = self.parse(text)
+        intent = self.intents.get(parsed.intent)
+        return intent.handler(parsed, *context) if intent else None
+
+    def route_many(self, messages):
+        """Parse a batch of messages without running any handlers"""
+        if self._regex is None:
+            self.compile()
+        return [self.parse(text) for text in messages]
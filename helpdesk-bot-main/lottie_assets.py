@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+import threading
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "lottie")
+BUNDLED = {
+    "https://assets10.lottiefiles.com/packages/lf20_jcikwtux.json": os.path.join(ASSET_DIR, "ticket_lottie.json")
+}
+FETCH_TIMEOUT = 5
+
+_loaded = {}
+_fetching = set()
+_lock = threading.Lock()
+
+
+def _cache_path(url):
+    return os.path.join(CACHE_DIR, hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _fetch(url):
+    """Download the animation once and store it in the on-disk cache"""
+    try:
+        import requests
+        r = requests.get(url, timeout=FETCH_TIMEOUT)
+        if r.status_code != 200:
+            return
+        data = r.json()
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = _cache_path(url) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, _cache_path(url))
+        with _lock:
+            _loaded[url] = data
+    except Exception:
+        pass
+
+
+def load_lottie(url):
+    """Return Lottie JSON for ``url`` without waiting on the network.
+
+    Looks in the process-wide memo, then the on-disk cache, then the copy
+    bundled in ``assets/``. If the disk cache is empty the animation is
+    fetched once in a background thread for later renders. Returns None
+    when nothing is available yet, so the page renders without it.
+    """
+    data = _loaded.get(url)
+    if data is not None:
+        return data
+    with _lock:
+        if url in _loaded:
+            return _loaded[url]
+        data = _read_json(_cache_path(url))
+        if data is None:
+            if url not in _fetching:
+                _fetching.add(url)
+                threading.Thread(target=_fetch, args=(url,), daemon=True).start()
+            if url in BUNDLED:
+                data = _read_json(BUNDLED[url])
+        if data is not None:
+            _loaded[url] = data
+        return data
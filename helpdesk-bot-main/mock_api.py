@@ -1,8 +1,94 @@
+import asyncio
+import bisect
+import itertools
+import math
 import random
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from ticket_cache import TicketCache, SharedTicketCache
+from ticket_index import TicketIndex
+from metrics import METRICS
+from shared_state import get_state
+from formatting import format_ticket_display, format_ticket_summary  # noqa: F401 (re-exported)
+
+SUBJECT_WORDS = [
+    "login", "password", "payment", "refund", "invoice", "crash", "slow", "dashboard",
+    "export", "email", "sync", "mobile", "api", "timeout", "report", "billing",
+    "upload", "notification", "integration", "permissions", "signup", "checkout"
+]
+SUBJECT_KINDS = ["issue", "error", "failure", "request", "question", "bug"]
+STATUSES = ["Open", "In Progress", "On Hold", "Closed"]
+PRIORITIES = ["Low", "Medium", "High"]
+AGENTS = ["John Doe", "Jane Smith", "Mike Johnson", "Priya Patel", "Chen Wei", "Support Team"]
+SEED_EPOCH = datetime(2025, 1, 1)
+
+
+def fixed_latency(ms):
+    """Latency model that always waits ``ms`` milliseconds"""
+    return lambda rng: ms / 1000
+
+
+def lognormal_latency(median_ms, sigma=0.5):
+    """Latency model with a long right tail around ``median_ms``"""
+    mu = math.log(median_ms / 1000)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+class FaultInjector:
+    """Simulated network latency and upstream errors for the mock.
+
+    ``latency`` is a callable taking a ``random.Random`` and returning
+    seconds; ``error_rates`` maps HTTP status codes (401, 429, 500, 503...)
+    to the probability of returning them.
+    """
+
+    def __init__(self, latency=None, error_rates=None, seed=None):
+        self.latency = latency
+        self.error_rates = dict(error_rates or {})
+        self.random = random.Random(seed)
+
+    def delay(self):
+        if self.latency:
+            time.sleep(self.latency(self.random))
+
+    def pick_error(self):
+        """Return an HTTP status code to fail with, or None"""
+        roll = self.random.random()
+        for status, rate in self.error_rates.items():
+            if roll < rate:
+                return int(status)
+            roll -= rate
+        return None
+
+
+def _timestamp(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
 
 class MockZohoDeskAPI:
-    def __init__(self):
+    """In-memory stand-in for ZohoDeskAPI.
+
+    With a shared state backend (``ZOHO_STATE_BACKEND=sqlite``) created
+    tickets and comments are appended to a log in the shared state and
+    replayed by every worker, and the ticket cache lives in the shared
+    state too, so all workers on the node see one store. Each worker still
+    keeps its own replica of the tickets and search index, so mock memory
+    grows with the number of workers.
+    """
+
+    def __init__(self, seed_tickets=0, seed=None, comments_per_ticket=0, faults=None, cache_size=1024, state=None):
+        self.faults = faults
+        self.comments = {}
+        self._lock = threading.Lock()
+        state = state or get_state()
+        self.state = state if state.shared else None
+        self.cache = SharedTicketCache(self.state, maxsize=cache_size) if self.state else TicketCache(maxsize=cache_size)
+        METRICS.register_collector("ticket_cache", self.cache.metric_samples)
+        # Fan-out for get_tickets, so injected latency overlaps as over HTTP
+        self.pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="mock-fanout")
+        self._log_seen = None
         self.tickets = {
             "12345": {
                 "ticketNumber": "12345",
@@ -35,17 +121,139 @@ class MockZohoDeskAPI:
                 "description": "Request for dark mode in application"
             }
         }
+        self.index = TicketIndex()
+        for ticket_id, ticket in self.tickets.items():
+            self.index.add(ticket_id, ticket)
+        self._ids = itertools.count(100000)
+        self._modified_order = None
+        if seed_tickets:
+            self.generate_tickets(seed_tickets, seed=seed, comments_per_ticket=comments_per_ticket)
+    
+    def generate_tickets(self, count, seed=None, comments_per_ticket=0):
+        """Add ``count`` reproducible synthetic tickets (and comments)"""
+        rng = random.Random(seed)
+        with self._lock:
+            for _ in range(count):
+                ticket_id = str(next(self._ids))
+                created = SEED_EPOCH + timedelta(seconds=rng.randrange(365 * 86400))
+                modified = created + timedelta(seconds=rng.randrange(7 * 86400))
+                area = rng.choice(SUBJECT_WORDS)
+                ticket = {
+                    "ticketNumber": ticket_id,
+                    "subject": f"{area.capitalize()} {rng.choice(SUBJECT_KINDS)} - {rng.choice(SUBJECT_WORDS)}",
+                    "description": " ".join(rng.choices(SUBJECT_WORDS, k=8)),
+                    "email": f"user{rng.randrange(100000)}@example.com",
+                    "status": rng.choice(STATUSES),
+                    "priority": rng.choice(PRIORITIES),
+                    "createdTime": _timestamp(created),
+                    "modifiedTime": _timestamp(modified),
+                    "assignee": {"name": rng.choice(AGENTS)}
+                }
+                self.tickets[ticket_id] = ticket
+                self.index.add(ticket_id, ticket)
+                self._modified_order = None
+                if comments_per_ticket:
+                    self.comments[ticket_id] = [
+                        {
+                            "id": f"{ticket_id}-{n}",
+                            "content": " ".join(rng.choices(SUBJECT_WORDS, k=12)),
+                            "isPublic": True,
+                            "commentedTime": _timestamp(created + timedelta(minutes=n * 7)),
+                            "commenter": {"name": rng.choice(AGENTS)}
+                        }
+                        for n in range(comments_per_ticket)
+                    ]
+    
+    def _publish(self, entry):
+        """Append a change to the shared log; the lock keeps sequence numbers
+        and log writes in order across workers"""
+        with self.state.lock("mock-store"):
+            seq = self.state.update("mock:seq", lambda v: (v or 0) + 1)
+            self.state.set(f"mock:log:{seq:012d}", entry)
+
+    def _sync(self):
+        """Replay log entries written since the last sync (by any worker)"""
+        if self.state is None:
+            return
+        while True:
+            entries = self.state.scan("mock:log:", after=self._log_seen)
+            if not entries:
+                return
+            with self._lock:
+                for key, entry in entries:
+                    if self._log_seen is not None and key <= self._log_seen:
+                        continue
+                    if entry["kind"] == "ticket":
+                        self._apply_ticket(entry["ticket"])
+                    else:
+                        self.comments.setdefault(entry["ticket_id"], []).append(entry["comment"])
+                    self._log_seen = key
+
+    def _apply_ticket(self, ticket):
+        """Add a created ticket to the store; caller holds ``_lock``"""
+        new_id = ticket["ticketNumber"]
+        self.tickets[new_id] = ticket
+        self.index.add(new_id, ticket)
+        if self._modified_order is not None:
+            bisect.insort(self._modified_order, (ticket["modifiedTime"], new_id))
+
+    def _simulate(self):
+        """Apply injected latency; returns an error result or None"""
+        if self.faults is None:
+            return None
+        self.faults.delay()
+        status = self.faults.pick_error()
+        if status:
+            return {'success': False, 'error': f'Error: HTTP {status}', 'status': status}
+        return None
     
     def refresh_access_token(self):
         return True
     
-    def get_ticket(self, ticket_id):
+    def get_ticket(self, ticket_id, modified_time=None):
+        cached = self.cache.get(ticket_id)
+        if cached is None and modified_time:
+            cached = self.cache.revalidate(ticket_id, modified_time)
+        if cached is not None:
+            return cached
+        return self._load_ticket(ticket_id)
+
+    def _load_ticket(self, ticket_id):
+        result = self._fetch_ticket(ticket_id)
+        self.cache.put(ticket_id, result)
+        return result
+
+    def _fetch_ticket(self, ticket_id):
+        failure = self._simulate()
+        if failure:
+            return failure
+        self._sync()
         if str(ticket_id) in self.tickets:
             return {'success': True, 'data': self.tickets[str(ticket_id)]}
         return {'success': False, 'error': 'Ticket not found'}
     
+    def get_tickets(self, ticket_ids):
+        """Fetch several tickets concurrently, like ZohoDeskAPI.get_tickets"""
+        ids = list(dict.fromkeys(str(t) for t in ticket_ids))
+        results = {}
+        for ticket_id in ids:
+            cached = self.cache.get(ticket_id)
+            if cached is not None:
+                results[ticket_id] = cached
+        missing = [t for t in ids if t not in results]
+        for ticket_id, result in zip(missing, self.pool.map(self._load_ticket, missing)):
+            results[ticket_id] = result
+        return {t: results[t] for t in ids}
+    
     def create_ticket(self, subject, description, email, priority="High"):
-        new_id = str(random.randint(20000, 99999))
+        failure = self._simulate()
+        if failure:
+            return failure
+        new_id = next(self._ids)
+        if self.state is not None:
+            # Allocate from a node-wide counter so workers never reuse an ID
+            new_id = self.state.update("mock:next_id", lambda v: max(int(v or 0) + 1, new_id))
+        new_id = str(new_id)
         ticket = {
             "ticketNumber": new_id,
             "subject": subject,
@@ -57,35 +265,121 @@ class MockZohoDeskAPI:
             "modifiedTime": datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
             "assignee": {"name": "Support Team"}
         }
-        self.tickets[new_id] = ticket
+        if self.state is not None:
+            self._publish({"kind": "ticket", "ticket": ticket})
+            self._sync()
+        else:
+            with self._lock:
+                self._apply_ticket(ticket)
+        self.cache.put(new_id, {'success': True, 'data': ticket})
         return {'success': True, 'data': ticket}
     
+    def list_tickets(self, from_index=0, limit=100, modified_since=None):
+        failure = self._simulate()
+        if failure:
+            return failure
+        self._sync()
+        with self._lock:
+            if self._modified_order is None:
+                self._modified_order = sorted((t.get('modifiedTime', ''), k) for k, t in self.tickets.items())
+            order = self._modified_order
+        start = bisect.bisect_left(order, (modified_since, '')) if modified_since else 0
+        page = order[start + from_index:start + from_index + limit]
+        return {'success': True, 'data': [self.tickets[ticket_id] for _, ticket_id in page]}
+    
+    def search_tickets(self, query="", status=None, priority=None, assignee=None, limit=50):
+        failure = self._simulate()
+        if failure:
+            return failure
+        self._sync()
+        ids = self.index.search(query, status=status, priority=priority, assignee=assignee, limit=limit)
+        return {'success': True, 'data': [self.tickets[ticket_id] for ticket_id in ids]}
+    
+    def get_ticket_comments(self, ticket_id, page=0, limit=20):
+        """One page of a ticket's comments, newest first"""
+        failure = self._simulate()
+        if failure:
+            return failure
+        self._sync()
+        if str(ticket_id) not in self.tickets:
+            return {'success': False, 'error': 'Ticket not found'}
+        comments = self.comments.get(str(ticket_id), [])
+        end = max(0, len(comments) - page * limit)
+        return {'success': True, 'data': comments[max(0, end - limit):end][::-1]}
+    
+    def get_ticket_threads(self, ticket_id, page=0, limit=20):
+        """The mock keeps no mail threads; the original request is the only one"""
+        failure = self._simulate()
+        if failure:
+            return failure
+        self._sync()
+        ticket = self.tickets.get(str(ticket_id))
+        if ticket is None:
+            return {'success': False, 'error': 'Ticket not found'}
+        threads = [{
+            "id": f"{ticket_id}-t0",
+            "channel": "EMAIL",
+            "direction": "in",
+            "summary": ticket.get("description", ""),
+            "createdTime": ticket.get("createdTime"),
+            "author": {"email": ticket.get("email", "")}
+        }]
+        return {'success': True, 'data': threads[page * limit:(page + 1) * limit]}
+    
     def add_comment(self, ticket_id, comment):
+        failure = self._simulate()
+        if failure:
+            return failure
+        self.cache.invalidate(ticket_id)
+        self._sync()
         if str(ticket_id) in self.tickets:
+            record = {
+                "id": f"{ticket_id}-c{len(self.comments.get(str(ticket_id), []))}",
+                "content": comment,
+                "isPublic": True,
+                "commentedTime": _timestamp(datetime.now()),
+                "commenter": {"name": "Support Team"}
+            }
+            if self.state is not None:
+                self._publish({"kind": "comment", "ticket_id": str(ticket_id), "comment": record})
+                self._sync()
+            else:
+                with self._lock:
+                    self.comments.setdefault(str(ticket_id), []).append(record)
             return {'success': True, 'data': {'comment': comment, 'added': True}}
         return {'success': False, 'error': 'Ticket not found'}
 
-def format_ticket_display(ticket_data):
-    ticket = ticket_data.get('data', {})
-    status_emoji = {'Open': '🔴', 'In Progress': '🟡', 'On Hold': '🟠', 'Closed': '🟢'}
-    priority_emoji = {'High': '🔥', 'Medium': '⚠️', 'Low': '📌'}
-    
-    return f"""
-### 📋 Ticket Details
+class AsyncMockZohoDeskAPI:
+    """asyncio counterpart of MockZohoDeskAPI for async workers.
+
+    Calls run on a thread pool sized to ``max_concurrency`` so injected
+    latency (which sleeps) overlaps like real network waits instead of
+    blocking the event loop.
+    """
 
-**Ticket ID:** #{ticket.get('ticketNumber', 'N/A')}
+    def __init__(self, max_concurrency=50, mock=None):
+        self.mock = mock or MockZohoDeskAPI()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="async-mock")
 
-**Status:** {status_emoji.get(ticket.get('status'), '⚪')} {ticket.get('status', 'Unknown')}
+    async def __aenter__(self):
+        return self
 
-**Priority:** {priority_emoji.get(ticket.get('priority'), '📌')} {ticket.get('priority', 'Normal')}
+    async def __aexit__(self, *exc):
+        await self.aclose()
 
-**Subject:** {ticket.get('subject', 'No subject')}
+    async def aclose(self):
+        self.executor.shutdown(wait=False)
 
-**Created:** {ticket.get('createdTime', 'N/A')}
+    async def _call(self, func, *args):
+        async with self.semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
 
-**Last Updated:** {ticket.get('modifiedTime', 'N/A')}
+    async def get_ticket(self, ticket_id, modified_time=None):
+        return await self._call(self.mock.get_ticket, ticket_id, modified_time)
 
-**Assigned To:** {ticket.get('assignee', {}).get('name', 'Unassigned')}
+    async def create_ticket(self, subject, description, email, priority="High"):
+        return await self._call(self.mock.create_ticket, subject, description, email, priority)
 
----
-"""
+    async def add_comment(self, ticket_id, comment):
+        return await self._call(self.mock.add_comment, ticket_id, comment)
@@ -0,0 +1,225 @@
+"""Local HTTP stand-in for Zoho Desk backed by MockZohoDeskAPI.
+
+Speaks the ``/api/v1/tickets...`` routes ZohoDeskAPI calls plus a fake
+``/oauth/v2/token`` so the real client can be exercised offline:
+
+    python mock_server.py --tickets 100000 --latency-ms 80 --error-rate 429=0.02
+
+then point the client at it with ``ZOHO_API_DOMAIN=http://127.0.0.1:8765``
+and ``ZOHO_ACCOUNTS_URL=http://127.0.0.1:8765/oauth/v2/token``.
+"""
+import argparse
+import json
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from mock_api import MockZohoDeskAPI, FaultInjector, fixed_latency, lognormal_latency
+
+
+class MockDeskServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the mock store and fault settings.
+
+    ``token_ttl`` (seconds) makes issued access tokens expire so refresh
+    paths get exercised; with ``token_ttl=None`` any token is accepted.
+    ``max_inflight`` caps concurrent requests and answers the excess with
+    429 + Retry-After, mimicking upstream backpressure.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 8765), api=None, faults=None, token_ttl=None, max_inflight=None):
+        super().__init__(address, MockDeskHandler)
+        self.api = api or MockZohoDeskAPI(cache_size=0)
+        self.faults = faults or FaultInjector()
+        self.token_ttl = token_ttl
+        self.tokens = {}
+        self.inflight = threading.BoundedSemaphore(max_inflight) if max_inflight else None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def issue_token(self):
+        token = f"1000.{secrets.token_hex(16)}"
+        self.tokens[token] = time.time() + (self.token_ttl or 3600)
+        return token
+
+    def token_valid(self, header):
+        if self.token_ttl is None:
+            return True
+        token = (header or "").replace("Zoho-oauthtoken ", "", 1)
+        expires_at = self.tokens.get(token)
+        return expires_at is not None and expires_at > time.time()
+
+    def start(self):
+        """Serve in a daemon thread and return the server"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class MockDeskHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, keep-alive
+    # clients wait ~40 ms for a delayed ACK on every response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=None, headers=None):
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def _handle(self, method):
+        server = self.server
+        parts = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        segments = [s for s in parts.path.split("/") if s]
+        body = self._body() if method in ("POST", "PATCH", "PUT") else {}
+
+        if server.inflight and not server.inflight.acquire(blocking=False):
+            return self._send(429, {"errorCode": "TOO_MANY_REQUESTS"}, {"Retry-After": "1"})
+        try:
+            server.faults.delay()
+            if segments == ["oauth", "v2", "token"] and method == "POST":
+                return self._send(200, {
+                    "access_token": server.issue_token(),
+                    "expires_in": server.token_ttl or 3600,
+                    "token_type": "Bearer"
+                })
+            if segments[:2] != ["api", "v1"]:
+                return self._send(404, {"errorCode": "URL_NOT_FOUND"})
+            if not server.token_valid(self.headers.get("Authorization")):
+                return self._send(401, {"errorCode": "INVALID_OAUTH"})
+            status = server.faults.pick_error()
+            if status:
+                headers = {"Retry-After": "1"} if status == 429 else None
+                return self._send(status, {"errorCode": f"HTTP_{status}"}, headers)
+            return self._route(method, segments[2:], query, body)
+        finally:
+            if server.inflight:
+                server.inflight.release()
+
+    def _route(self, method, segments, query, body):
+        api = self.server.api
+        if segments == ["tickets", "search"] and method == "GET":
+            result = api.search_tickets(
+                query.get("_all", ""),
+                status=query.get("status"),
+                priority=query.get("priority"),
+                assignee=query.get("assigneeId"),
+                limit=int(query.get("limit", 50))
+            )
+            if not result['data']:
+                return self._send(204)
+            return self._send(200, {"data": result['data']})
+        if segments == ["tickets"] and method == "GET":
+            since = query.get("modifiedTimeRange", "").split(",")[0] or None
+            result = api.list_tickets(
+                from_index=int(query.get("from", 0)),
+                limit=int(query.get("limit", 100)),
+                modified_since=since
+            )
+            if not result['data']:
+                return self._send(204)
+            return self._send(200, {"data": result['data']})
+        if segments == ["tickets"] and method == "POST":
+            result = api.create_ticket(
+                body.get("subject", ""), body.get("description", ""),
+                body.get("email", ""), body.get("priority", "High")
+            )
+            return self._send(200, result['data'])
+        if len(segments) == 2 and segments[0] == "tickets" and method == "GET":
+            result = api.get_ticket(segments[1])
+            if result['success']:
+                return self._send(200, result['data'])
+            return self._send(404, {"errorCode": "RESOURCE_NOT_FOUND"})
+        if len(segments) == 3 and segments[0] == "tickets" and segments[2] in ("comments", "threads") and method == "GET":
+            limit = int(query.get("limit", 20))
+            fetch = api.get_ticket_comments if segments[2] == "comments" else api.get_ticket_threads
+            result = fetch(segments[1], page=int(query.get("from", 0)) // max(limit, 1), limit=limit)
+            if not result['success']:
+                return self._send(404, {"errorCode": "RESOURCE_NOT_FOUND"})
+            if not result['data']:
+                return self._send(204)
+            return self._send(200, {"data": result['data']})
+        if len(segments) == 3 and segments[0] == "tickets" and segments[2] == "comments" and method == "POST":
+            result = api.add_comment(segments[1], body.get("content", ""))
+            if result['success']:
+                return self._send(200, result['data'])
+            return self._send(404, {"errorCode": "RESOURCE_NOT_FOUND"})
+        return self._send(404, {"errorCode": "URL_NOT_FOUND"})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+def _error_rate(value):
+    status, rate = value.split("=")
+    return int(status), float(rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Zoho Desk stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tickets", type=int, default=0, help="synthetic tickets to generate")
+    parser.add_argument("--comments", type=int, default=0, help="comments per synthetic ticket")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=0, help="median response latency")
+    parser.add_argument("--latency-sigma", type=float, default=0, help="lognormal spread; 0 for fixed latency")
+    parser.add_argument("--error-rate", type=_error_rate, action="append", default=[],
+                        metavar="STATUS=RATE", help="e.g. 429=0.02 (repeatable)")
+    parser.add_argument("--token-ttl", type=float, default=None, help="access token lifetime in seconds")
+    parser.add_argument("--max-inflight", type=int, default=None)
+    args = parser.parse_args()
+
+    latency = None
+    if args.latency_ms:
+        latency = (lognormal_latency(args.latency_ms, args.latency_sigma) if args.latency_sigma
+                   else fixed_latency(args.latency_ms))
+    server = MockDeskServer(
+        (args.host, args.port),
+        api=MockZohoDeskAPI(seed_tickets=args.tickets, seed=args.seed,
+                            comments_per_ticket=args.comments, cache_size=0),
+        faults=FaultInjector(latency=latency, error_rates=dict(args.error_rate), seed=args.seed),
+        token_ttl=args.token_ttl,
+        max_inflight=args.max_inflight
+    )
+    print(f"Mock Zoho Desk listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from retry import classify_failure
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    owner TEXT,
+    lease_until REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_ready ON outbox (status, next_attempt_at);
+"""
+
+# Columns added after the first release, created on startup if missing
+MIGRATIONS = {
+    "owner": "ALTER TABLE outbox ADD COLUMN owner TEXT",
+    "lease_until": "ALTER TABLE outbox ADD COLUMN lease_until REAL",
+}
+
+REVIEW_NOTE = "Delivery outcome unknown; check Zoho before resubmitting"
+
+
+class Outbox:
+    """Durable write-behind queue for create_ticket and add_comment.
+
+    Submissions are stored in SQLite (WAL mode) under an idempotency key
+    and acknowledged immediately; background workers drain them in
+    batches through ``api`` with exponential backoff. Re-enqueueing an
+    existing key returns the original entry instead of a duplicate.
+
+    Workers may share one outbox file across processes. A claim records
+    the worker's ``owner`` id and a lease: claimed entries move to
+    ``sending`` one at a time just before delivery. When a lease expires
+    (its worker died), unsent ``claimed`` entries are requeued, while a
+    ``sending`` entry may already exist in Zoho and goes to ``review``.
+
+    Failures are only retried when Zoho cannot have acted on them (see
+    ``retry.classify_failure``); other 4xx responses fail, and anything
+    ambiguous, like a read timeout, goes to ``review`` rather than risking
+    a duplicate ticket or comment.
+    """
+
+    HANDLERS = {
+        "create_ticket": lambda api, p: api.create_ticket(p["subject"], p["description"], p["email"], p["priority"]),
+        "add_comment": lambda api, p: api.add_comment(p["ticket_id"], p["comment"]),
+    }
+
+    def __init__(self, api, path, workers=2, batch_size=10, max_attempts=8, poll_interval=0.5, lease=300):
+        self.api = api
+        self.path = path
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads = []
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._db() as db:
+            db.executescript(SCHEMA)
+            columns = {row['name'] for row in db.execute("PRAGMA table_info(outbox)")}
+            for column, ddl in MIGRATIONS.items():
+                if column not in columns:
+                    db.execute(ddl)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    @contextmanager
+    def _db(self):
+        """Connection that commits on success and is always closed"""
+        db = self._connect()
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def enqueue(self, kind, payload, idempotency_key=None):
+        """Store a submission and return its status without waiting on Zoho"""
+        if kind not in self.HANDLERS:
+            raise ValueError(f"Unknown outbox operation: {kind}")
+        key = idempotency_key or uuid.uuid4().hex
+        now = time.time()
+        with self._db() as db:
+            db.execute(
+                "INSERT OR IGNORE INTO outbox (idempotency_key, kind, payload, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(payload), now, now)
+            )
+        self._wake.set()
+        return {'success': True, 'data': self.status(key)}
+
+    def enqueue_ticket(self, subject, description, email, priority="High", idempotency_key=None):
+        return self.enqueue("create_ticket", {
+            "subject": subject, "description": description, "email": email, "priority": priority
+        }, idempotency_key)
+
+    def enqueue_comment(self, ticket_id, comment, idempotency_key=None):
+        return self.enqueue("add_comment", {"ticket_id": str(ticket_id), "comment": comment}, idempotency_key)
+
+    def status(self, idempotency_key):
+        """Current state of a submission: queued, claimed, sending, done,
+        failed or review"""
+        with self._db() as db:
+            row = db.execute(
+                "SELECT idempotency_key, kind, status, attempts, result, error FROM outbox WHERE idempotency_key = ?",
+                (idempotency_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'id': row['idempotency_key'],
+            'kind': row['kind'],
+            'status': row['status'],
+            'attempts': row['attempts'],
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error']
+        }
+
+    def pending_count(self):
+        with self._db() as db:
+            return db.execute("SELECT COUNT(*) FROM outbox WHERE status IN ('queued', 'claimed', 'sending')").fetchone()[0]
+
+    def _claim(self):
+        """Atomically lease a batch of due entries to this worker, first
+        settling entries whose lease expired"""
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            expired = "lease_until IS NULL OR lease_until < ?"
+            db.execute(f"UPDATE outbox SET status = 'queued', owner = NULL, updated_at = ? "
+                       f"WHERE status = 'claimed' AND ({expired})", (now, now))
+            db.execute(f"UPDATE outbox SET status = 'review', owner = NULL, error = ?, updated_at = ? "
+                       f"WHERE status = 'sending' AND ({expired})", (REVIEW_NOTE, now, now))
+            rows = db.execute(
+                "SELECT id, kind, payload, attempts FROM outbox "
+                "WHERE status = 'queued' AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (now, self.batch_size)
+            ).fetchall()
+            if rows:
+                db.executemany(
+                    "UPDATE outbox SET status = 'claimed', owner = ?, lease_until = ?, updated_at = ? WHERE id = ?",
+                    [(self.owner, now + self.lease, now, row['id']) for row in rows]
+                )
+            db.execute("COMMIT")
+            return rows
+        finally:
+            db.close()
+
+    def _start_sending(self, row):
+        """Renew the lease and mark ``row`` as sending; False if this
+        worker no longer owns it"""
+        now = time.time()
+        with self._db() as db:
+            return db.execute(
+                "UPDATE outbox SET status = 'sending', lease_until = ?, updated_at = ? "
+                "WHERE id = ? AND owner = ? AND status = 'claimed'",
+                (now + self.lease, now, row['id'], self.owner)
+            ).rowcount == 1
+
+    def _deliver(self, row):
+        if not self._start_sending(row):
+            return
+        try:
+            result = self.HANDLERS[row['kind']](self.api, json.loads(row['payload']))
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        attempts = row['attempts'] + 1
+        now = time.time()
+        if result['success']:
+            update = ("done", attempts, now, json.dumps(result['data']), None)
+        else:
+            kind = classify_failure(result)
+            if kind == "retry" and attempts < self.max_attempts:
+                update = ("queued", attempts, now + min(300, 2 ** attempts), None, result['error'])
+            elif kind == "unknown":
+                update = ("review", attempts, now, None, f"{result['error']} ({REVIEW_NOTE})")
+            else:
+                update = ("failed", attempts, now, None, result['error'])
+        with self._db() as db:
+            db.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, result = ?, error = ?, "
+                "owner = NULL, lease_until = NULL, updated_at = ? WHERE id = ?",
+                update + (now, row['id'])
+            )
+
+    def drain_once(self):
+        """Deliver one batch; returns the number of entries processed"""
+        rows = self._claim()
+        for row in rows:
+            self._deliver(row)
+        return len(rows)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                processed = self.drain_once()
+            except sqlite3.OperationalError:
+                processed = 0
+            if not processed:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def start(self):
+        """Start the background worker pool"""
+        if self._threads:
+            return self
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"outbox-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
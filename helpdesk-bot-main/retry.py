@@ -0,0 +1,195 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE")
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Rejected before the server acted on the request, so resubmitting is safe
+UNPROCESSED_STATUSES = (401, 429)
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_failure(result):
+    """Whether a failed write such as create_ticket may be resubmitted.
+
+    ``retry``     the server did not act on it: a 401/429 rejection or a
+                  request that never reached it (``not_sent`` in the result)
+    ``rejected``  any other 4xx; the same payload would fail the same way
+    ``unknown``   a 5xx, timeout or other error after the request was sent,
+                  so the ticket or comment may exist; check before resending
+    """
+    status = result.get('status')
+    if result.get('not_sent') or status in UNPROCESSED_STATUSES:
+        return "retry"
+    if status is not None and 400 <= status < 500:
+        return "rejected"
+    return "unknown"
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honouring Retry-After.
+
+    Non-idempotent requests (POST such as create_ticket) are only retried
+    when the server cannot have acted on them: a 429 rejection or a
+    connection that was never established. Idempotent requests are also
+    retried on 5xx responses and read failures.
+    """
+
+    def __init__(self, max_attempts=4, base_delay=0.3, max_delay=8.0, max_retry_after=30.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.random = random.Random()
+
+    def delay(self, attempt, retry_after=None):
+        """Seconds to sleep before retry number ``attempt`` (0-based)"""
+        backoff = self.random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        wait = parse_retry_after(retry_after)
+        if wait is not None:
+            return min(self.max_retry_after, max(wait, backoff))
+        return backoff
+
+    def should_retry_status(self, attempt, status_code, idempotent):
+        if attempt + 1 >= self.max_attempts or status_code not in RETRY_STATUSES:
+            return False
+        return status_code == 429 or idempotent
+
+    def should_retry_error(self, attempt, not_sent, idempotent):
+        """``not_sent`` is True when the request never reached the server"""
+        if attempt + 1 >= self.max_attempts:
+            return False
+        return not_sent or idempotent
+
+
+class TokenBucket:
+    """Thread-safe token bucket smoothing bursts to ``rate`` requests/second.
+
+    A ``rate`` of 0 disables limiting apart from explicit pauses.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens=1, timeout=None):
+        """Block until ``tokens`` are available; returns seconds waited, or
+        None if ``timeout`` elapsed first"""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and (self.rate <= 0 or self.tokens >= tokens):
+                    self.tokens = max(0.0, self.tokens - tokens)
+                    return now - started
+                refill_wait = (tokens - self.tokens) / self.rate if self.rate > 0 else 0.0
+                wait = max(self.paused_until - now, refill_wait)
+            if timeout is not None and now + wait - started > timeout:
+                return None
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold every caller back, e.g. after the server answered 429"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class SharedTokenBucket:
+    """TokenBucket whose level lives in a shared state backend, so every
+    worker process on the node draws from one quota.
+
+    Each acquire is one atomic ``state.update``; wall-clock time is used
+    because monotonic clocks are not comparable across processes.
+    """
+
+    def __init__(self, state, key, rate, capacity):
+        self.state = state
+        self.key = key
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+
+    def _take(self, tokens):
+        """Take ``tokens`` if available; returns seconds to wait (0 if taken)"""
+        wait = 0.0
+
+        def step(entry):
+            nonlocal wait
+            now = time.time()
+            entry = entry or {"tokens": self.capacity, "updated": now, "paused_until": 0.0}
+            level = min(self.capacity, entry["tokens"] + max(0.0, now - entry["updated"]) * self.rate)
+            if now >= entry["paused_until"] and (self.rate <= 0 or level >= tokens):
+                level = max(0.0, level - tokens)
+            else:
+                refill_wait = (tokens - level) / self.rate if self.rate > 0 else 0.0
+                wait = max(entry["paused_until"] - now, refill_wait, 0.001)
+            return {"tokens": level, "updated": now, "paused_until": entry["paused_until"]}
+
+        self.state.update(self.key, step)
+        return wait
+
+    def acquire(self, tokens=1, timeout=None):
+        """Block until ``tokens`` are available; returns seconds waited, or
+        None if ``timeout`` elapsed first"""
+        started = time.monotonic()
+        while True:
+            wait = self._take(tokens)
+            now = time.monotonic()
+            if not wait:
+                return now - started
+            if timeout is not None and now + wait - started > timeout:
+                return None
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold every caller in every worker back"""
+        until = time.time() + seconds
+
+        def step(entry):
+            entry = entry or {"tokens": self.capacity, "updated": time.time(), "paused_until": 0.0}
+            return dict(entry, paused_until=max(entry["paused_until"], until))
+
+        self.state.update(self.key, step)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def shared_bucket(name, rate, capacity, state=None):
+    """Process-wide TokenBucket for ``name``, created on first use.
+
+    With a shared ``state`` backend the bucket is a SharedTokenBucket
+    spanning every worker process that uses the same state.
+    """
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None:
+            if state is not None:
+                bucket = SharedTokenBucket(state, f"bucket:{name}", rate, capacity)
+            else:
+                bucket = TokenBucket(rate, capacity)
+            _buckets[name] = bucket
+        return bucket
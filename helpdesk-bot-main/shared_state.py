@@ -0,0 +1,216 @@
+"""Key/value state shared by every app worker process on a node.
+
+Selected with ``ZOHO_STATE_BACKEND``:
+
+    memory  (default) process-local, the single-worker behaviour
+    sqlite  one SQLite file at ``ZOHO_STATE_PATH`` shared by all workers
+
+With the sqlite backend the OAuth token, rate-limit buckets, ticket cache
+and mock store are kept in the shared file, so running N Streamlit
+workers behind a load balancer does not multiply token refreshes, API
+calls or cached tickets. Values must be JSON-serialisable.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from config import get_setting
+
+try:
+    import fcntl
+except ImportError:  # Windows: named locks only exclude threads of this process
+    fcntl = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def _prefix_end(prefix):
+    return prefix + "\uffff"
+
+
+class MemoryState:
+    """Process-local backend; ``shared`` is False so callers keep their own
+    in-memory structures"""
+
+    shared = False
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.RLock()
+        self._named = {}
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry[0] if entry else default
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.time())
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def update(self, key, func):
+        """Atomically replace the value with ``func(current)`` and return it"""
+        with self._lock:
+            value = func(self.get(key))
+            self.set(key, value)
+            return value
+
+    def scan(self, prefix, after=None, limit=1000):
+        """``(key, value)`` pairs under ``prefix`` in key order, after ``after``"""
+        with self._lock:
+            keys = sorted(k for k in self._data if k.startswith(prefix) and k > (after or prefix))
+            return [(k, self._data[k][0]) for k in keys[:limit]]
+
+    def count(self, prefix):
+        with self._lock:
+            return sum(1 for k in self._data if k.startswith(prefix))
+
+    def trim(self, prefix, maxsize):
+        """Drop the oldest-written keys under ``prefix`` beyond ``maxsize``"""
+        with self._lock:
+            keys = sorted((k for k in self._data if k.startswith(prefix)), key=lambda k: self._data[k][1])
+            stale = keys[:max(0, len(keys) - maxsize)]
+            for key in stale:
+                del self._data[key]
+            return len(stale)
+
+    def clear(self, prefix):
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+    def lock(self, name):
+        with self._lock:
+            return self._named.setdefault(name, threading.Lock())
+
+
+class SQLiteState:
+    """Backend on a SQLite file (WAL mode) shared by processes on one node.
+
+    ``update`` runs inside ``BEGIN IMMEDIATE`` so read-modify-write cycles
+    from different processes serialise; ``lock(name)`` is an exclusive
+    ``flock`` on a sidecar file for longer critical sections such as an
+    OAuth refresh.
+    """
+
+    shared = True
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._thread_locks = {}
+        self._thread_locks_guard = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._conn() as db:
+            db.executescript(SCHEMA)
+
+    def _conn(self):
+        """One connection per thread, reused across calls"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, key, default=None):
+        row = self._conn().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key, value):
+        self._conn().execute(
+            "INSERT INTO kv (key, value, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+            (key, json.dumps(value), time.time())
+        )
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def update(self, key, func):
+        """Atomically replace the value with ``func(current)`` and return it"""
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            value = func(self.get(key))
+            self.set(key, value)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return value
+
+    def scan(self, prefix, after=None, limit=1000):
+        """``(key, value)`` pairs under ``prefix`` in key order, after ``after``"""
+        rows = self._conn().execute(
+            "SELECT key, value FROM kv WHERE key > ? AND key < ? ORDER BY key LIMIT ?",
+            (after or prefix, _prefix_end(prefix), limit)
+        ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def count(self, prefix):
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM kv WHERE key >= ? AND key < ?", (prefix, _prefix_end(prefix))
+        ).fetchone()[0]
+
+    def trim(self, prefix, maxsize):
+        """Drop the oldest-written keys under ``prefix`` beyond ``maxsize``"""
+        return self._conn().execute(
+            "DELETE FROM kv WHERE key IN (SELECT key FROM kv WHERE key >= ? AND key < ? "
+            "ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (prefix, _prefix_end(prefix), maxsize)
+        ).rowcount
+
+    def clear(self, prefix):
+        self._conn().execute("DELETE FROM kv WHERE key >= ? AND key < ?", (prefix, _prefix_end(prefix)))
+
+    @contextmanager
+    def lock(self, name):
+        """Exclusive across threads and processes for the duration of the block"""
+        with self._thread_locks_guard:
+            thread_lock = self._thread_locks.setdefault(name, threading.Lock())
+        with thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(f"{self.path}.{name}.lock", "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+
+BACKENDS = {
+    "memory": lambda: MemoryState(),
+    "sqlite": lambda: SQLiteState(get_setting("ZOHO_STATE_PATH", ".cache/state.sqlite3")),
+}
+
+_state = None
+_state_lock = threading.Lock()
+
+
+def get_state():
+    """Process-wide state backend chosen by ``ZOHO_STATE_BACKEND``"""
+    global _state
+    with _state_lock:
+        if _state is None:
+            name = get_setting("ZOHO_STATE_BACKEND", "memory")
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown ZOHO_STATE_BACKEND: {name}")
+            _state = BACKENDS[name]()
+        return _state
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import retry  # noqa: E402
+from mock_api import MockZohoDeskAPI  # noqa: E402
+from mock_server import MockDeskServer  # noqa: E402
+from zoho_api import ZohoDeskAPI  # noqa: E402
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(**kwargs):
+        server = MockDeskServer(("127.0.0.1", 0), api=MockZohoDeskAPI(cache_size=0), **kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def server(serve):
+    return serve()
+
+
+@pytest.fixture
+def client_for(monkeypatch):
+    monkeypatch.setenv("ZOHO_RATE_LIMIT_PER_SECOND", "0")
+    monkeypatch.setenv("ZOHO_RETRY_BASE_DELAY", "0.01")
+    monkeypatch.setattr(retry, "_buckets", {})
+    clients = []
+
+    def build(server, **kwargs):
+        client = ZohoDeskAPI(base_url=server.url, accounts_url=f"{server.url}/oauth/v2/token", **kwargs)
+        clients.append(client)
+        return client
+
+    yield build
+    for client in clients:
+        client.pool.shutdown()
+        client.transport.close()
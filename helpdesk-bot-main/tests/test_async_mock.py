@@ -0,0 +1,18 @@
+import asyncio
+import time
+
+from mock_api import AsyncMockZohoDeskAPI, FaultInjector, MockZohoDeskAPI, fixed_latency
+
+
+def test_injected_latency_overlaps_across_concurrent_calls():
+    mock = MockZohoDeskAPI(cache_size=0, faults=FaultInjector(latency=fixed_latency(50)))
+
+    async def run():
+        async with AsyncMockZohoDeskAPI(max_concurrency=20, mock=mock) as api:
+            started = time.perf_counter()
+            results = await asyncio.gather(*(api.get_ticket("12345") for _ in range(20)))
+            return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(run())
+    assert all(r['success'] for r in results)
+    assert elapsed < 0.5
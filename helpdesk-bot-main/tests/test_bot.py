@@ -0,0 +1,110 @@
+import pytest
+
+from bot import ROUTER, fetch_ticket_view, process_message
+from mock_api import MockZohoDeskAPI
+
+
+class RecordingOutbox:
+    def __init__(self):
+        self.comments = []
+
+    def enqueue_comment(self, ticket_id, comment, idempotency_key=None):
+        self.comments.append((ticket_id, comment))
+        return {'success': True, 'data': {'status': 'queued'}}
+
+
+class RecordingAPI(MockZohoDeskAPI):
+    def __init__(self):
+        super().__init__(cache_size=0)
+        self.searches = []
+
+    def add_comment(self, ticket_id, comment):
+        raise AssertionError("chat must not write to Zoho directly")
+
+    def search_tickets(self, query="", status=None, priority=None, assignee=None, limit=50):
+        self.searches.append((query, status, priority))
+        return super().search_tickets(query, status=status, priority=priority, assignee=assignee, limit=limit)
+
+
+@pytest.fixture
+def api():
+    return RecordingAPI()
+
+
+@pytest.fixture
+def outbox():
+    return RecordingOutbox()
+
+
+@pytest.mark.parametrize("message,intent", [
+    ("12345", "status"),
+    ("what is the status of 12345", "status"),
+    ("Is there any reply on 12345?", "status"),
+    ("please check 12345 asap", "status"),
+    ("ticket 12345 is urgent, what is the status", "status"),
+    ("how does escalation work?", "fallback"),
+    ("comment on 12345", "status"),
+    ("comment on 12345: works now", "comment"),
+    ("Add a comment to ticket #12345: still broken", "comment"),
+    ("escalate 12345", "escalate"),
+    ("Escalate ticket 12345: customer is blocked", "escalate"),
+    ("search login error high", "search"),
+    ("show tickets that are open", "search"),
+    ("show open tickets", "search"),
+    ("list high priority tickets", "search"),
+    ("show me all my closed tickets", "search"),
+    ("show 12345", "status"),
+    ("I want to create a new ticket", "create"),
+    ("help", "help"),
+    ("hello there", "fallback"),
+])
+def test_intent_selection(message, intent):
+    assert ROUTER.parse(message).intent == intent
+
+
+@pytest.mark.parametrize("message", [
+    "Is there any reply on 12345?",
+    "please check 12345 asap",
+    "ticket 12345 is urgent, what is the status",
+])
+def test_questions_mentioning_a_ticket_only_read_it(api, outbox, message):
+    kind, _ = process_message(message, api, outbox)
+    assert kind == "ticket"
+    assert outbox.comments == []
+
+
+def test_comment_command_is_queued(api, outbox):
+    kind, text = process_message("comment on 12345: works now", api, outbox)
+    assert outbox.comments == [("12345", "works now")]
+    assert "queued" in text
+
+
+def test_comment_without_text_is_not_queued(api, outbox):
+    process_message("comment on 12345:", api, outbox)
+    assert outbox.comments == []
+
+
+def test_escalate_command_is_queued_with_reason(api, outbox):
+    process_message("escalate 12345: customer is blocked", api, outbox)
+    assert outbox.comments == [("12345", "Escalation requested via helpdesk chat: customer is blocked")]
+
+
+def test_writes_need_an_outbox(api):
+    kind, text = process_message("escalate 12345", api)
+    assert kind == "text" and text.startswith("❌")
+
+
+def test_search_drops_filler_and_keeps_filters(api, outbox):
+    process_message("show tickets that are open", api, outbox)
+    process_message("find all the high priority tickets about login", api, outbox)
+    process_message("show open tickets", api, outbox)
+    process_message("list high priority tickets", api, outbox)
+    assert api.searches == [("", "Open", None), ("login", None, "High"), ("", "Open", None), ("", None, "High")]
+
+
+def test_ticket_view_reuses_a_kept_comment_page(api):
+    page = {'success': True, 'data': [{'content': 'kept'}]}
+    api.get_ticket_comments = lambda *args: pytest.fail("comments refetched")
+    header, comments = fetch_ticket_view(api, "12345", comments=page)
+    assert header.result()['success']
+    assert comments.result() is page
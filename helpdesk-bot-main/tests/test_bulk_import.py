@@ -0,0 +1,95 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from bulk_import import BulkImporter
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Creates tickets by appending the subject to a log, and SIGKILLs the
+# process on the 250th call, before that ticket is created
+CRASHING_IMPORT = """
+import itertools, os, signal, sys, threading
+from bulk_import import BulkImporter
+log_path, checkpoint = sys.argv[1:3]
+calls = itertools.count(1)
+lock = threading.Lock()
+
+class API:
+    def create_ticket(self, subject, description, email, priority):
+        with lock:
+            if next(calls) == 250:
+                os.kill(os.getpid(), signal.SIGKILL)
+            with open(log_path, "a") as log:
+                log.write(subject + "\\n")
+        return {'success': True, 'data': {'ticketNumber': subject}}
+
+rows = ((n, {"email": "a@example.com", "subject": f"row {n}", "description": "d"}, None) for n in range(1, 501))
+BulkImporter(API(), checkpoint, workers=4, rate=0).run(rows)
+"""
+
+
+class LoggingAPI:
+    def __init__(self, log_path, failures=None):
+        self.log_path = log_path
+        self.failures = failures or {}
+        self.lock = threading.Lock()
+
+    def create_ticket(self, subject, description, email, priority):
+        if subject in self.failures:
+            return self.failures[subject]
+        with self.lock, open(self.log_path, "a") as log:
+            log.write(subject + "\n")
+        return {'success': True, 'data': {'ticketNumber': subject}}
+
+
+def rows(count):
+    return ((n, {"email": "a@example.com", "subject": f"row {n}", "description": "d"}, None)
+            for n in range(1, count + 1))
+
+
+def created(log_path):
+    with open(log_path) as log:
+        return log.read().split("\n")[:-1]
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+def test_resume_after_kill_creates_no_duplicates(tmp_path):
+    log_path, checkpoint = str(tmp_path / "created.log"), str(tmp_path / "import.sqlite3")
+    proc = subprocess.run([sys.executable, "-c", CRASHING_IMPORT, log_path, checkpoint], cwd=APP_DIR)
+    assert proc.returncode == -signal.SIGKILL
+    assert len(created(log_path)) == 249
+
+    importer = BulkImporter(LoggingAPI(log_path), checkpoint, workers=4, rate=0)
+    counts = importer.run(rows(500))
+    statuses = dict(importer.db.execute("SELECT row, status FROM rows"))
+    importer.close()
+
+    subjects = created(log_path)
+    assert len(subjects) == len(set(subjects))
+    review = [n for n, status in statuses.items() if status == "review"]
+    assert counts["review"] == len(review) <= 4 * 4
+    assert len(subjects) + len(review) >= 500
+    assert all(statuses[n] == "created" for n in range(1, 501) if n not in review)
+
+
+def test_only_unprocessed_failures_are_retried_on_resume(tmp_path):
+    log_path, checkpoint = str(tmp_path / "created.log"), str(tmp_path / "import.sqlite3")
+    failures = {
+        "row 1": {'success': False, 'error': 'Error: HTTP 429', 'status': 429},
+        "row 2": {'success': False, 'error': 'Read timed out', 'not_sent': False},
+    }
+    importer = BulkImporter(LoggingAPI(log_path, failures), checkpoint, rate=0)
+    counts = importer.run(rows(3))
+    importer.close()
+    assert (counts["created"], counts["failed"], counts["review"]) == (1, 1, 1)
+
+    importer = BulkImporter(LoggingAPI(log_path), checkpoint, rate=0)
+    counts = importer.run(rows(3))
+    importer.close()
+    assert (counts["created"], counts["resumed"]) == (1, 2)
+    assert sorted(created(log_path)) == ["row 1", "row 3"]
@@ -0,0 +1,26 @@
+import pytest
+
+from metrics import METRICS, MetricsRegistry, endpoint_label, record_response
+
+
+@pytest.mark.parametrize("url,label", [
+    ("https://desk.zoho.in/api/v1/tickets/123", "GET /api/v1/tickets/{id}"),
+    ("https://desk.zoho.in/api/v1/tickets/123/comments?from=20&limit=20", "GET /api/v1/tickets/{id}/comments"),
+    ("https://desk.zoho.in/api/v1/tickets?from=0", "GET /api/v1/tickets"),
+    ("https://desk.zoho.in", "GET /"),
+    ("/api/v1/tickets/42", "GET /api/v1/tickets/{id}"),
+])
+def test_endpoint_label_templates_ids(url, label):
+    assert endpoint_label("get", url) == label
+
+
+def test_record_response_aggregates_by_template():
+    class Response:
+        status_code = 200
+        elapsed = None
+
+    METRICS.reset()
+    for ticket_id in range(100000, 100005):
+        record_response("GET", f"https://desk.zoho.in/api/v1/tickets/{ticket_id}", 0.0, Response())
+    key = MetricsRegistry.key("zoho_responses_total", endpoint="GET /api/v1/tickets/{id}", status="2xx")
+    assert METRICS.counters[key] == 5
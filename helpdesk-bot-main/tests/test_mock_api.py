@@ -0,0 +1,19 @@
+import time
+
+from mock_api import FaultInjector, MockZohoDeskAPI, fixed_latency
+
+
+def test_get_tickets_fetches_concurrently():
+    api = MockZohoDeskAPI(seed_tickets=10, seed=1, cache_size=0, faults=FaultInjector(latency=fixed_latency(50)))
+    ids = [str(100000 + n) for n in range(10)]
+    started = time.perf_counter()
+    results = api.get_tickets(ids)
+    elapsed = time.perf_counter() - started
+    assert all(results[t]['success'] for t in ids)
+    assert elapsed < 0.25
+
+
+def test_get_tickets_counts_each_miss_once():
+    api = MockZohoDeskAPI()
+    api.get_tickets(["12345", "67890", "424242"])
+    assert api.cache.stats()['misses'] == 3
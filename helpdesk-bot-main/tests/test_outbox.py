@@ -0,0 +1,134 @@
+import sqlite3
+
+import pytest
+
+from outbox import Outbox
+
+
+class ScriptedAPI:
+    """create_ticket returns the queued results in order"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def create_ticket(self, subject, description, email, priority="High"):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+CREATED = {'success': True, 'data': {'ticketNumber': '100001'}}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "outbox.sqlite3")
+
+
+def deliver(path, *results, **kwargs):
+    api = ScriptedAPI(*results)
+    outbox = Outbox(api, path, **kwargs)
+    key = outbox.enqueue_ticket("Subject", "Description", "user@example.com")['data']['id']
+    outbox.drain_once()
+    return outbox.status(key), api
+
+
+def test_success_is_done(path):
+    entry, _ = deliver(path, CREATED)
+    assert entry['status'] == 'done'
+    assert entry['result'] == CREATED['data']
+
+
+@pytest.mark.parametrize("failure", [
+    {'success': False, 'error': 'Error: HTTP 429', 'status': 429},
+    {'success': False, 'error': 'Error: HTTP 401', 'status': 401},
+    {'success': False, 'error': 'Connection refused', 'not_sent': True},
+])
+def test_unprocessed_failures_are_requeued(path, failure):
+    entry, _ = deliver(path, failure)
+    assert entry['status'] == 'queued'
+    assert entry['attempts'] == 1
+
+
+@pytest.mark.parametrize("failure", [
+    {'success': False, 'error': 'Error: HTTP 400', 'status': 400},
+    {'success': False, 'error': 'Error: HTTP 422', 'status': 422},
+])
+def test_validation_errors_fail_without_retry(path, failure):
+    entry, _ = deliver(path, failure)
+    assert entry['status'] == 'failed'
+
+
+@pytest.mark.parametrize("failure", [
+    {'success': False, 'error': 'Read timed out', 'not_sent': False},
+    {'success': False, 'error': 'Error: HTTP 500', 'status': 500},
+    {'success': False, 'error': 'Error: No response'},
+    RuntimeError("boom"),
+])
+def test_ambiguous_failures_need_review(path, failure):
+    entry, _ = deliver(path, failure)
+    assert entry['status'] == 'review'
+    assert 'check Zoho' in entry['error']
+
+
+def test_retries_stop_at_max_attempts(path):
+    entry, _ = deliver(path, {'success': False, 'error': 'Error: HTTP 429', 'status': 429}, max_attempts=1)
+    assert entry['status'] == 'failed'
+
+
+def test_live_lease_is_not_reclaimed_by_another_worker(path):
+    first = Outbox(ScriptedAPI(), path)
+    key = first.enqueue_ticket("Subject", "Description", "user@example.com")['data']['id']
+    assert len(first._claim()) == 1
+    second_api = ScriptedAPI(CREATED)
+    second = Outbox(second_api, path)
+    assert second.drain_once() == 0
+    assert second_api.calls == 0
+    assert first.status(key)['status'] == 'claimed'
+
+
+def test_expired_claim_is_requeued_and_delivered_once(path):
+    crashed = Outbox(ScriptedAPI(), path, lease=0)
+    key = crashed.enqueue_ticket("Subject", "Description", "user@example.com")['data']['id']
+    rows = crashed._claim()
+    survivor_api = ScriptedAPI(CREATED)
+    survivor = Outbox(survivor_api, path)
+    assert survivor.drain_once() == 1
+    assert survivor.status(key)['status'] == 'done'
+    # The crashed worker lost its claim and must not deliver again
+    crashed._deliver(rows[0])
+    assert survivor_api.calls == 1
+    assert survivor.status(key)['status'] == 'done'
+
+
+def test_expired_send_goes_to_review(path):
+    crashed = Outbox(ScriptedAPI(), path, lease=0)
+    key = crashed.enqueue_ticket("Subject", "Description", "user@example.com")['data']['id']
+    assert crashed._start_sending(crashed._claim()[0])
+    survivor_api = ScriptedAPI(CREATED)
+    survivor = Outbox(survivor_api, path)
+    assert survivor.drain_once() == 0
+    assert survivor_api.calls == 0
+    assert survivor.status(key)['status'] == 'review'
+
+
+def test_existing_outbox_is_migrated(path):
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, idempotency_key TEXT NOT NULL UNIQUE, "
+        "kind TEXT NOT NULL, payload TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'queued', "
+        "attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL DEFAULT 0, result TEXT, error TEXT, "
+        "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+    )
+    db.execute(
+        "INSERT INTO outbox (idempotency_key, kind, payload, status, created_at, updated_at) "
+        "VALUES ('old', 'create_ticket', '{}', 'sending', 0, 0)"
+    )
+    db.commit()
+    db.close()
+    outbox = Outbox(ScriptedAPI(), path)
+    assert outbox.drain_once() == 0
+    assert outbox.status('old')['status'] == 'review'
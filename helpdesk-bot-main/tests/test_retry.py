@@ -0,0 +1,42 @@
+import pytest
+
+from retry import RetryPolicy
+
+
+@pytest.fixture
+def policy():
+    return RetryPolicy(max_attempts=3)
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_idempotent_requests_retry_throttling_and_server_errors(policy, status):
+    assert policy.should_retry_status(0, status, idempotent=True)
+
+
+@pytest.mark.parametrize("status,expected", [(429, True), (500, False), (502, False), (503, False), (504, False)])
+def test_non_idempotent_requests_only_retry_429(policy, status, expected):
+    assert policy.should_retry_status(0, status, idempotent=False) is expected
+
+
+@pytest.mark.parametrize("status", [200, 400, 401, 404, 422])
+def test_other_statuses_are_not_retried(policy, status):
+    assert not policy.should_retry_status(0, status, idempotent=True)
+
+
+def test_retries_stop_at_max_attempts(policy):
+    assert policy.should_retry_status(1, 429, idempotent=True)
+    assert not policy.should_retry_status(2, 429, idempotent=True)
+    assert not policy.should_retry_error(2, not_sent=True, idempotent=True)
+
+
+def test_errors_retry_only_when_unsent_or_idempotent(policy):
+    assert policy.should_retry_error(0, not_sent=True, idempotent=False)
+    assert policy.should_retry_error(0, not_sent=False, idempotent=True)
+    assert not policy.should_retry_error(0, not_sent=False, idempotent=False)
+
+
+def test_delay_honours_retry_after_up_to_the_cap():
+    policy = RetryPolicy(base_delay=0.01, max_retry_after=5)
+    assert policy.delay(0, "2") == 2
+    assert policy.delay(0, "120") == 5
+    assert 0 <= policy.delay(0) <= 0.01
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from mock_api import MockZohoDeskAPI
+from retry import SharedTokenBucket
+from shared_state import SQLiteState
+
+
+@pytest.fixture
+def states(tmp_path):
+    """Two backends on one file, standing in for two worker processes"""
+    path = str(tmp_path / "state.sqlite3")
+    return SQLiteState(path), SQLiteState(path)
+
+
+def test_values_are_visible_across_connections(states):
+    first, second = states
+    first.set("greeting", {"text": "hello"})
+    assert second.get("greeting") == {"text": "hello"}
+    second.delete("greeting")
+    assert first.get("greeting") is None
+
+
+def test_updates_from_two_connections_do_not_lose_increments(states):
+    def bump(state):
+        for _ in range(50):
+            state.update("counter", lambda v: (v or 0) + 1)
+
+    threads = [threading.Thread(target=bump, args=(state,)) for state in states]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert states[0].get("counter") == 100
+
+
+def test_named_lock_excludes_other_connections(states):
+    first, second = states
+    held = threading.Event()
+
+    def hold():
+        with first.lock("refresh"):
+            held.set()
+            time.sleep(0.2)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    held.wait()
+    started = time.monotonic()
+    with second.lock("refresh"):
+        waited = time.monotonic() - started
+    thread.join()
+    assert waited >= 0.15
+
+
+def test_bucket_is_drained_by_both_connections(states):
+    first = SharedTokenBucket(states[0], "bucket:zoho:", rate=0.001, capacity=3)
+    second = SharedTokenBucket(states[1], "bucket:zoho:", rate=0.001, capacity=3)
+    assert first.acquire(timeout=0) is not None
+    assert first.acquire(timeout=0) is not None
+    assert second.acquire(timeout=0) is not None
+    assert second.acquire(timeout=0) is None
+    assert first.acquire(timeout=0) is None
+
+
+def test_pause_holds_back_the_other_connection(states):
+    first = SharedTokenBucket(states[0], "bucket:zoho:", rate=0, capacity=1)
+    second = SharedTokenBucket(states[1], "bucket:zoho:", rate=0, capacity=1)
+    first.pause(60)
+    assert second.acquire(timeout=0.01) is None
+
+
+def test_created_ticket_is_visible_to_a_worker_that_missed_it(states):
+    worker_a = MockZohoDeskAPI(state=states[0])
+    worker_b = MockZohoDeskAPI(state=states[1])
+    assert worker_b.get_ticket("100000") == {'success': False, 'error': 'Ticket not found'}
+    created = worker_a.create_ticket("Printer on fire", "Third floor", "user@example.com")
+    assert created['data']['ticketNumber'] == "100000"
+    assert worker_b.get_ticket("100000") == created
@@ -0,0 +1,33 @@
+from ticket_index import TicketIndex
+
+
+def ticket(subject, status="Open", priority="High", assignee="Jane"):
+    return {"subject": subject, "status": status, "priority": priority, "assignee": {"name": assignee}}
+
+
+def test_search_returns_newest_matches_first():
+    index = TicketIndex()
+    for ticket_id in ("200", "1000", "99", "500"):
+        index.add(ticket_id, ticket("Login error"))
+    assert index.search("login") == ["1000", "500", "200", "99"]
+    assert index.search("login", limit=2) == ["1000", "500"]
+
+
+def test_search_intersects_terms_and_filters():
+    index = TicketIndex()
+    index.add("1", ticket("Payment failed", priority="High"))
+    index.add("2", ticket("Payment failed", priority="Low"))
+    index.add("3", ticket("Login failed", priority="High"))
+    index.add("4", ticket("Payment failed", status="Closed", priority="High"))
+    assert index.search("payment", priority="high") == ["4", "1"]
+    assert index.search("payment failed", status="Open", priority="High") == ["1"]
+    assert index.search("refund") == []
+
+
+def test_remove_drops_ticket_from_every_posting():
+    index = TicketIndex()
+    index.add("1", ticket("Login error"))
+    index.add("2", ticket("Login error"))
+    index.remove("2", ticket("Login error"))
+    assert index.search("login") == ["1"]
+    assert index.search(status="open") == ["1"]
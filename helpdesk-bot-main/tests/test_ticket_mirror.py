@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from mock_api import MockZohoDeskAPI
+from ticket_mirror import SyncEngine, TicketMirror
+
+
+class CountingAPI:
+    """Wraps the mock to count list_tickets pages"""
+
+    def __init__(self, api):
+        self.api = api
+        self.pages = 0
+
+    def list_tickets(self, **kwargs):
+        self.pages += 1
+        return self.api.list_tickets(**kwargs)
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    return TicketMirror(str(tmp_path / "mirror.sqlite3"))
+
+
+def test_backfill_then_incremental_poll(mirror):
+    api = MockZohoDeskAPI(seed_tickets=1050, seed=1, cache_size=0)
+    engine = SyncEngine(api, mirror, page_size=100)
+    # Each page restarts at the newest modifiedTime seen, so boundary tickets are pulled twice
+    assert engine.sync_once() >= 1053
+    assert mirror.count() == 1053
+    assert mirror.get_state("cursor") == max(t['modifiedTime'] for t in api.tickets.values())
+
+    created = api.create_ticket("Printer on fire", "Third floor", "user@example.com")['data']
+    synced = engine.sync_once()
+    # The poll restarts at the cursor, so only tickets at or after it come back
+    assert 1 <= synced < 10
+    assert mirror.get(created['ticketNumber'])['subject'] == "Printer on fire"
+    assert mirror.count() == 1054
+
+
+@pytest.mark.parametrize("same_time", [250, 200])
+def test_pages_full_of_one_modified_time_are_stepped_by_offset(mirror, same_time):
+    api = MockZohoDeskAPI(seed_tickets=same_time, seed=1, cache_size=0)
+    for ticket in list(api.tickets.values())[3:]:
+        ticket['modifiedTime'] = "2026-01-01T00:00:00Z"
+    api._modified_order = None
+    counting = CountingAPI(api)
+    engine = SyncEngine(counting, mirror, page_size=100)
+    assert engine.sync_once() >= same_time + 3
+    assert mirror.count() == same_time + 3
+    assert counting.pages <= same_time // 100 + 2
+    assert mirror.get_state("cursor") == "2026-01-01T00:00:00Z"
+
+
+def test_get_ticket_uses_a_fresh_mirror_and_goes_live_once_stale(server, client_for, mirror, monkeypatch):
+    monkeypatch.setenv("ZOHO_CACHE_SIZE", "0")
+    monkeypatch.setenv("ZOHO_MIRROR_MAX_STALENESS", "120")
+    mirror.upsert_many([{"ticketNumber": "12345", "subject": "From the mirror"}])
+    client = client_for(server, mirror=mirror)
+
+    mirror.set_state(last_sync_at=time.time() - 60)
+    assert client.get_ticket("12345")['data']['subject'] == "From the mirror"
+
+    mirror.set_state(last_sync_at=time.time() - 121)
+    assert client.get_ticket("12345")['data']['subject'].startswith("Login Issue")
+
+    mirror.set_state(last_sync_at="")
+    assert client.get_ticket("12345")['data']['subject'].startswith("Login Issue")
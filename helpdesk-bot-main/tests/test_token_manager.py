@@ -0,0 +1,60 @@
+import json
+import os
+import stat
+
+import pytest
+
+from token_manager import TokenManager
+
+
+def failing_fetch(calls):
+    def fetch():
+        calls.append(1)
+        return None
+    return fetch
+
+
+def test_failed_refresh_is_not_retried_during_cooldown():
+    calls = []
+    tokens = TokenManager(failing_fetch(calls), access_token="old", expires_in=-1, failure_cooldown=60)
+    for _ in range(20):
+        tokens.get_token()
+    assert len(calls) == 1
+
+
+def test_manual_refresh_bypasses_cooldown():
+    calls = []
+    tokens = TokenManager(failing_fetch(calls), access_token="old", expires_in=-1, failure_cooldown=60)
+    tokens.get_token()
+    assert tokens.refresh() is False
+    assert len(calls) == 2
+
+
+def test_proactive_refresh_not_restarted_during_cooldown():
+    calls = []
+    tokens = TokenManager(failing_fetch(calls), access_token="old", expires_in=100,
+                          refresh_margin=300, failure_cooldown=60)
+    tokens.get_token()
+    tokens._background.join()
+    for _ in range(20):
+        assert tokens.get_token() == "old"
+    assert tokens._background is None or not tokens._background.is_alive()
+    assert len(calls) == 1
+
+
+def test_success_after_cooldown():
+    responses = [None, {"access_token": "new", "expires_in": 3600}]
+    tokens = TokenManager(lambda: responses.pop(0), access_token="old", expires_in=-1, failure_cooldown=0)
+    tokens.get_token()
+    assert tokens.get_token() == "new"
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+def test_token_cache_file_is_private(tmp_path):
+    cache_file = tmp_path / "zoho_token.json"
+    (tmp_path / "zoho_token.json.tmp").write_text("{}")
+    os.chmod(tmp_path / "zoho_token.json.tmp", 0o644)
+    tokens = TokenManager(lambda: {"access_token": "new", "expires_in": 3600}, cache_file=str(cache_file))
+    assert tokens.refresh()
+    assert stat.S_IMODE(os.stat(cache_file).st_mode) == 0o600
+    assert json.loads(cache_file.read_text())["access_token"] == "new"
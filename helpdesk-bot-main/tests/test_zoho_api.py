@@ -0,0 +1,67 @@
+class ScriptedFaults:
+    """Fails the next requests with the given statuses, then succeeds"""
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+
+    def delay(self):
+        pass
+
+    def pick_error(self):
+        return self.statuses.pop(0) if self.statuses else None
+
+
+def test_missing_ticket_is_negatively_cached(server, client_for):
+    client = client_for(server)
+    result = client.get_ticket("424242")
+    assert result == {'success': False, 'error': 'Ticket not found'}
+    assert client.cache.get("424242") == result
+    assert client.cache.stats()['size'] == 1
+
+
+def test_found_ticket(server, client_for):
+    result = client_for(server).get_ticket("12345")
+    assert result['success']
+    assert result['data']['subject'].startswith("Login Issue")
+
+
+def test_401_refreshes_the_token_and_retries(serve, client_for, monkeypatch):
+    monkeypatch.setenv("ZOHO_ACCESS_TOKEN", "stale")
+    server = serve(token_ttl=60)
+    client = client_for(server)
+    result = client.get_ticket("12345")
+    assert result['success']
+    assert client.tokens.access_token != "stale"
+    assert client.tokens.access_token in server.tokens
+
+
+def test_429_is_retried_after_backoff(serve, client_for):
+    client = client_for(serve(faults=ScriptedFaults(429, 429)))
+    client.retry.max_retry_after = 0.01
+    result = client.create_ticket("Printer on fire", "Third floor", "user@example.com")
+    assert result['success']
+    assert result['data']['subject'] == "Printer on fire"
+
+
+def test_429_gives_up_after_max_attempts(serve, client_for):
+    client = client_for(serve(faults=ScriptedFaults(*[429] * 4)))
+    client.retry.max_retry_after = 0.01
+    result = client.create_ticket("Printer on fire", "Third floor", "user@example.com")
+    assert not result['success']
+    assert result['status'] == 429
+
+
+def test_comments_of_missing_ticket(server, client_for):
+    client = client_for(server)
+    assert client.get_ticket_comments("424242") == {'success': False, 'error': 'Ticket not found'}
+    assert client.get_ticket_threads("424242") == {'success': False, 'error': 'Ticket not found'}
+
+
+def test_get_tickets_counts_each_miss_once(server, client_for):
+    client = client_for(server)
+    results = client.get_tickets(["12345", "67890", "424242", "12345"])
+    assert list(results) == ["12345", "67890", "424242"]
+    assert client.cache.stats()['misses'] == 3
+    client.get_tickets(["12345", "67890"])
+    assert client.cache.stats()['hits'] == 2
+    assert client.cache.stats()['misses'] == 3
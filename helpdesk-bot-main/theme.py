@@ -0,0 +1,77 @@
+"""Static theme markup for app.py, built once per process.
+
+Streamlit re-executes app.py on every interaction; keeping the CSS here
+means it is parsed once at import instead of on each rerun.
+"""
+
+# Dark background and accent colors
+THEME_CSS = """
+    <style>
+    body, [data-testid="stAppViewContainer"], [data-testid="stHeader"], .css-1d391kg {background-color: #191c24 !important;}
+    h1, h2, h3, h4, h5, h6, div, code, p, span, label {
+        color: #f7f7fb !important;
+        font-weight: bold !important;
+        letter-spacing: 0.02em;
+    }
+    .big-font {font-size:30px !important; color:#1598FF;text-shadow: 0 0 18px #FF914D;}
+    .stButton>button, button {
+        background-color: #1598FF !important;
+        color: #fff !important;
+        border-radius: 8px !important;
+        font-weight: bold !important;
+        border: none !important;
+        box-shadow: 0 0 10px #1598FF44 !important;
+        transition: background 0.2s;
+    }
+    .stButton>button:hover, button:hover {
+        background-color: #FF914D !important;
+        color: #fff !important;
+    }
+    [data-testid="stSidebar"], section[data-testid="stSidebar"] {
+        background: linear-gradient(135deg, #232534 80%, #1598FF 100%) !important;
+        color: #fff !important;
+    }
+    [data-testid="stSidebar"] h1, [data-testid="stSidebar"] h2, [data-testid="stSidebar"] h3, 
+    [data-testid="stSidebar"] h4, [data-testid="stSidebar"] h5, [data-testid="stSidebar"] h6, 
+    [data-testid="stSidebar"] div, [data-testid="stSidebar"] p, [data-testid="stSidebar"] label {
+        color: #fff !important;
+        text-shadow: 0 0 4px #1598FFCC;
+        font-weight: bold !important;
+    }
+    .glass-card {
+        background: rgba(21,152,255,0.08); 
+        border-radius:18px; 
+        padding:26px 34px 22px 34px;
+        box-shadow:0 8px 28px rgba(255,145,77,0.13); 
+        margin-bottom:22px;
+    }
+    .glass-card * {
+        color: #f0f0f0 !important;
+    }
+    .glass-card b {
+        color: #1598FF !important;
+    }
+    .glass-card span[style*="color:#FF914D"] {
+        color: #FF914D !important;
+    }
+    .accent-title {color: #FF914D !important; text-shadow: 0 0 12px #1598FF;}
+    .accent-hr {border: 1px solid #FF914D; border-radius: 6px; margin-bottom: 12px;}
+    
+    /* --- Make Priority Dropdown Options Visible in Black --- */
+    [data-baseweb="select"] > div {
+        color: #000 !important;
+        background-color: #fff !important;
+    }
+    [data-baseweb="select"] div[role="option"] {
+        color: #000 !important;
+        background-color: #fff !important;
+        font-weight: bold !important;
+    }
+    [data-baseweb="select"] div[role="option"]:hover {
+        background-color: #e8e8e8 !important;
+        color: #000 !important;
+    }
+    </style>
+"""
+
+BANNER_HTML = '<p class="big-font">Welcome to your smart helpdesk assistant!</p>'
@@ -0,0 +1,177 @@
+import threading
+import time
+from collections import OrderedDict
+
+NOT_FOUND = 'Ticket not found'
+
+
+class TicketCache:
+    """Bounded TTL/LRU cache of get_ticket results keyed by ticket ID.
+
+    Successful lookups live for ``ttl`` seconds and "Ticket not found"
+    results for ``negative_ttl`` seconds; other errors are never cached.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60, negative_ttl=15):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, ticket_id):
+        """Return a fresh cached result or None"""
+        key = str(ticket_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if entry[1]['success']:
+                self.hits += 1
+            else:
+                self.negative_hits += 1
+            return entry[1]
+
+    def put(self, ticket_id, result):
+        """Cache a get_ticket result if it is cacheable"""
+        if result['success']:
+            ttl = self.ttl
+        elif result.get('error') == NOT_FOUND:
+            ttl = self.negative_ttl
+        else:
+            return
+        key = str(ticket_id)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def revalidate(self, ticket_id, modified_time):
+        """Reuse a (possibly expired) entry if its modifiedTime still matches.
+
+        Returns the cached result with a renewed TTL, or None when the ticket
+        has changed and must be refetched.
+        """
+        key = str(ticket_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry[1]['success']:
+                return None
+            if entry[1]['data'].get('modifiedTime') != modified_time:
+                return None
+            self._entries[key] = (time.monotonic() + self.ttl, entry[1])
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def invalidate(self, ticket_id):
+        with self._lock:
+            self._entries.pop(str(ticket_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _size(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Hit/miss counters for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                'size': self._size(),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': (self.hits + self.negative_hits) / lookups if lookups else 0.0
+            }
+
+    def metric_samples(self):
+        """Gauges for the metrics registry"""
+        stats = self.stats()
+        return [
+            ('ticket_cache_lookups', {'result': 'hit'}, stats['hits']),
+            ('ticket_cache_lookups', {'result': 'negative_hit'}, stats['negative_hits']),
+            ('ticket_cache_lookups', {'result': 'miss'}, stats['misses']),
+            ('ticket_cache_evictions', {}, stats['evictions']),
+            ('ticket_cache_size', {}, stats['size'])
+        ]
+
+
+class SharedTicketCache(TicketCache):
+    """TicketCache stored in a shared state backend under ``ticket:<id>``.
+
+    Every worker on the node sees one copy of each ticket. Expiry uses wall
+    time; size is bounded by trimming the oldest-written entries every
+    ``trim_every`` puts. Hit/miss counters stay per process.
+    """
+
+    PREFIX = "ticket:"
+
+    def __init__(self, state, maxsize=1024, ttl=60, negative_ttl=15, trim_every=64):
+        super().__init__(maxsize=maxsize, ttl=ttl, negative_ttl=negative_ttl)
+        self.state = state
+        self.trim_every = trim_every
+        self._puts = 0
+
+    def get(self, ticket_id):
+        entry = self.state.get(self.PREFIX + str(ticket_id))
+        with self._lock:
+            if entry is None or entry['expires_at'] < time.time():
+                self.misses += 1
+                return None
+            if entry['result']['success']:
+                self.hits += 1
+            else:
+                self.negative_hits += 1
+            return entry['result']
+
+    def put(self, ticket_id, result):
+        if result['success']:
+            ttl = self.ttl
+        elif result.get('error') == NOT_FOUND:
+            ttl = self.negative_ttl
+        else:
+            return
+        if self.maxsize <= 0:
+            return
+        self.state.set(self.PREFIX + str(ticket_id), {'expires_at': time.time() + ttl, 'result': result})
+        with self._lock:
+            self._puts += 1
+            trim = self._puts % self.trim_every == 0
+        if trim:
+            evicted = self.state.trim(self.PREFIX, self.maxsize)
+            with self._lock:
+                self.evictions += evicted
+
+    def revalidate(self, ticket_id, modified_time):
+        key = self.PREFIX + str(ticket_id)
+        entry = self.state.get(key)
+        if entry is None or not entry['result']['success']:
+            return None
+        if entry['result']['data'].get('modifiedTime') != modified_time:
+            return None
+        self.state.set(key, {'expires_at': time.time() + self.ttl, 'result': entry['result']})
+        with self._lock:
+            self.hits += 1
+        return entry['result']
+
+    def invalidate(self, ticket_id):
+        self.state.delete(self.PREFIX + str(ticket_id))
+
+    def clear(self):
+        self.state.clear(self.PREFIX)
+
+    def _size(self):
+        return self.state.count(self.PREFIX)
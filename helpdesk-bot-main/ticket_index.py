@@ -0,0 +1,107 @@
+import re
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+TOKEN_RE = re.compile(r'\w+')
+EMPTY = array('q')
+
+
+def tokenize(text):
+    return set(TOKEN_RE.findall(text.lower())) if text else set()
+
+
+def _posting():
+    return array('q')
+
+
+def _insert(posting, ticket_id):
+    """Add ``ticket_id`` keeping ``posting`` sorted; new tickets append"""
+    if not posting or posting[-1] < ticket_id:
+        posting.append(ticket_id)
+        return
+    i = bisect_left(posting, ticket_id)
+    if i == len(posting) or posting[i] != ticket_id:
+        posting.insert(i, ticket_id)
+
+
+def _discard(posting, ticket_id):
+    i = bisect_left(posting, ticket_id)
+    if i < len(posting) and posting[i] == ticket_id:
+        del posting[i]
+
+
+class TicketIndex:
+    """In-memory inverted index over ticket subject/description.
+
+    Secondary indexes map status, priority and assignee name to ticket IDs.
+    Postings are sorted arrays of integer IDs (ticket numbers are numeric),
+    so a search walks the smallest posting from its newest end, probes the
+    others by binary search, and stops once ``limit`` IDs have matched.
+    """
+
+    def __init__(self):
+        self.terms = defaultdict(_posting)
+        self.status = defaultdict(_posting)
+        self.priority = defaultdict(_posting)
+        self.assignee = defaultdict(_posting)
+
+    @staticmethod
+    def _fields(ticket):
+        assignee = (ticket.get('assignee') or {}).get('name', '')
+        return (
+            tokenize(ticket.get('subject', '')) | tokenize(ticket.get('description', '')),
+            (ticket.get('status') or '').lower(),
+            (ticket.get('priority') or '').lower(),
+            assignee.lower()
+        )
+
+    def add(self, ticket_id, ticket):
+        ticket_id = int(ticket_id)
+        terms, status, priority, assignee = self._fields(ticket)
+        for term in terms:
+            _insert(self.terms[term], ticket_id)
+        _insert(self.status[status], ticket_id)
+        _insert(self.priority[priority], ticket_id)
+        _insert(self.assignee[assignee], ticket_id)
+
+    def remove(self, ticket_id, ticket):
+        """Drop a ticket; ``ticket`` must be the version that was indexed"""
+        ticket_id = int(ticket_id)
+        terms, status, priority, assignee = self._fields(ticket)
+        for term in terms:
+            _discard(self.terms[term], ticket_id)
+        _discard(self.status[status], ticket_id)
+        _discard(self.priority[priority], ticket_id)
+        _discard(self.assignee[assignee], ticket_id)
+
+    def search(self, query="", status=None, priority=None, assignee=None, limit=50):
+        """Return up to ``limit`` matching ticket IDs, newest IDs first"""
+        postings = [self.terms.get(term, EMPTY) for term in tokenize(query)]
+        if status:
+            postings.append(self.status.get(status.lower(), EMPTY))
+        if priority:
+            postings.append(self.priority.get(priority.lower(), EMPTY))
+        if assignee:
+            postings.append(self.assignee.get(assignee.lower(), EMPTY))
+        if not postings or limit <= 0:
+            return []
+        postings.sort(key=len)
+        others = postings[1:]
+        # Candidates arrive in descending order, so each probe can search
+        # below the position the previous one landed on
+        bounds = [len(other) for other in others]
+        matches = []
+        for ticket_id in reversed(postings[0]):
+            for n, other in enumerate(others):
+                i = bisect_left(other, ticket_id, 0, bounds[n])
+                bounds[n] = i
+                if i == len(other) or other[i] != ticket_id:
+                    break
+            else:
+                matches.append(str(ticket_id))
+                if len(matches) >= limit:
+                    break
+            if 0 in bounds:
+                break
+        return matches
@@ -0,0 +1,193 @@
+"""Local SQLite mirror of tickets kept current by polling modifiedTime.
+
+Run the sync engine standalone next to the app:
+
+    python ticket_mirror.py --path .cache/tickets.sqlite3 --interval 30
+
+and give ZohoDeskAPI the same mirror (``ZOHO_MIRROR_PATH``) so get_ticket
+can answer from it while it is fresher than ``ZOHO_MIRROR_MAX_STALENESS``.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from metrics import METRICS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    id TEXT PRIMARY KEY,
+    ticket_number TEXT,
+    modified_time TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tickets_number ON tickets (ticket_number);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class TicketMirror:
+    """SQLite store of ticket JSON keyed by ticket ID and ticket number"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._conn() as db:
+            db.executescript(SCHEMA)
+
+    def _conn(self):
+        """One connection per thread, reused across lookups"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def upsert_many(self, tickets):
+        rows = [
+            (
+                str(t.get('id') or t.get('ticketNumber')),
+                str(t.get('ticketNumber', '')),
+                t.get('modifiedTime', ''),
+                json.dumps(t)
+            )
+            for t in tickets
+        ]
+        with self._conn() as db:
+            db.executemany(
+                "INSERT INTO tickets (id, ticket_number, modified_time, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET ticket_number = excluded.ticket_number, "
+                "modified_time = excluded.modified_time, data = excluded.data",
+                rows
+            )
+
+    def get(self, ticket_id):
+        """Return the mirrored ticket dict, looked up by ID or ticket number"""
+        ticket_id = str(ticket_id)
+        row = self._conn().execute("SELECT data FROM tickets WHERE id = ?", (ticket_id,)).fetchone()
+        if row is None:
+            row = self._conn().execute("SELECT data FROM tickets WHERE ticket_number = ?", (ticket_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+
+    def get_state(self, key, default=None):
+        row = self._conn().execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_state(self, **values):
+        with self._conn() as db:
+            db.executemany(
+                "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                [(k, str(v)) for k, v in values.items()]
+            )
+
+    def age(self):
+        """Seconds since the last completed sync, or None if never synced"""
+        synced_at = self.get_state("last_sync_at")
+        return time.time() - float(synced_at) if synced_at else None
+
+
+class SyncEngine:
+    """Backfills and then incrementally polls tickets into a TicketMirror.
+
+    Each pass pages through ``api.list_tickets`` in ascending modifiedTime
+    order from the persisted cursor, so the initial backfill and later polls
+    are the same resumable loop.
+    """
+
+    def __init__(self, api, mirror, page_size=100, interval=30):
+        self.api = api
+        self.mirror = mirror
+        self.page_size = page_size
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sync_once(self):
+        """Pull every ticket modified since the cursor; returns tickets synced.
+
+        Pages are keyed on modifiedTime rather than a growing offset, so a
+        ticket edited mid-pass moves ahead of the cursor instead of shifting
+        later pages and being skipped. The cursor is persisted per page.
+        """
+        started = time.time()
+        since = self.mirror.get_state("cursor") or None
+        offset = 0
+        synced = 0
+        while True:
+            result = self.api.list_tickets(from_index=offset, limit=self.page_size, modified_since=since)
+            if not result['success']:
+                raise RuntimeError(result['error'])
+            page = result['data']
+            if page:
+                self.mirror.upsert_many(page)
+                synced += len(page)
+            if len(page) < self.page_size:
+                if page:
+                    since = max(t.get('modifiedTime', '') for t in page)
+                break
+            newest = max(t.get('modifiedTime', '') for t in page)
+            if newest == since:
+                # A full page sharing one timestamp: step past it by offset
+                offset += len(page)
+            else:
+                since, offset = newest, 0
+            self.mirror.set_state(cursor=since)
+        self.mirror.set_state(cursor=since or "", last_sync_at=started)
+        return synced
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                METRICS.inc("ticket_sync_tickets_total", self.sync_once())
+            except Exception as e:
+                METRICS.inc("ticket_sync_errors_total", error=type(e).__name__)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ticket-sync", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    from zoho_api import ZohoDeskAPI
+
+    parser = argparse.ArgumentParser(description="Sync Zoho Desk tickets into a local SQLite mirror")
+    parser.add_argument("--path", default=".cache/tickets.sqlite3")
+    parser.add_argument("--interval", type=float, default=30, help="seconds between incremental polls")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--once", action="store_true", help="run a single sync pass and exit")
+    args = parser.parse_args()
+
+    mirror = TicketMirror(args.path)
+    engine = SyncEngine(ZohoDeskAPI(), mirror, page_size=args.page_size, interval=args.interval)
+    if args.once:
+        print(f"Synced {engine.sync_once()} tickets ({mirror.count()} mirrored)")
+        return
+    while True:
+        started = time.time()
+        try:
+            print(f"Synced {engine.sync_once()} tickets ({mirror.count()} mirrored)")
+        except Exception as e:
+            print(f"Sync failed: {e}")
+        time.sleep(max(0, args.interval - (time.time() - started)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from metrics import METRICS
+
+DEFAULT_REFRESH_MARGIN = 300
+DEFAULT_FAILURE_COOLDOWN = 10
+TOKEN_STATE_KEY = "zoho:token"
+
+
+class TokenManager:
+    """Expiry-aware OAuth access token holder shared by every session.
+
+    ``fetch_token`` is called to obtain a new token and must return a dict
+    with ``access_token`` and ``expires_in`` (seconds), or None on failure.
+    Only one refresh runs at a time; concurrent callers wait for it and reuse
+    its result. Tokens nearing expiry are refreshed in the background.
+    After a failed refresh, automatic refreshes are skipped for
+    ``failure_cooldown`` seconds so an accounts outage is not hammered.
+
+    With a shared ``state`` backend the token is also published there and
+    refreshes take a cross-process lock, so a worker adopts a token another
+    worker already refreshed instead of requesting its own.
+    """
+
+    def __init__(self, fetch_token, access_token="", expires_in=None,
+                 refresh_margin=DEFAULT_REFRESH_MARGIN, cache_file=None, state=None,
+                 failure_cooldown=DEFAULT_FAILURE_COOLDOWN):
+        self.fetch_token = fetch_token
+        self.refresh_margin = refresh_margin
+        self.failure_cooldown = failure_cooldown
+        self._failed_at = None
+        self.cache_file = cache_file
+        self.state = state
+        self.access_token = access_token
+        self.expires_at = time.time() + expires_in if expires_in else None
+        self._refresh_lock = threading.Lock()
+        self._background = None
+        self._load()
+        self._adopt_shared()
+
+    def _load(self):
+        """Load a persisted token if it is still valid"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        expires_at = data.get("expires_at")
+        if data.get("access_token") and expires_at and expires_at > time.time():
+            self.access_token = data["access_token"]
+            self.expires_at = expires_at
+
+    def _save(self):
+        """Persist the current token atomically, readable by the owner only"""
+        if not self.cache_file:
+            return
+        tmp = f"{self.cache_file}.tmp"
+        try:
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            if hasattr(os, "fchmod"):
+                os.fchmod(fd, 0o600)  # a leftover tmp file keeps its old mode
+            with os.fdopen(fd, "w") as f:
+                json.dump({"access_token": self.access_token, "expires_at": self.expires_at}, f)
+            os.replace(tmp, self.cache_file)
+        except OSError:
+            pass
+
+    def _adopt_shared(self):
+        """Take over a newer token published by another worker"""
+        if self.state is None:
+            return False
+        data = self.state.get(TOKEN_STATE_KEY)
+        if not data or not data.get("access_token") or data["access_token"] == self.access_token:
+            return False
+        expires_at = data.get("expires_at")
+        if expires_at is not None and expires_at <= time.time():
+            return False
+        self.access_token = data["access_token"]
+        self.expires_at = expires_at
+        return True
+
+    def _cooling_down(self):
+        return self._failed_at is not None and time.monotonic() - self._failed_at < self.failure_cooldown
+
+    def seconds_left(self):
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.time()
+
+    def get_token(self):
+        """Return a usable access token, refreshing first if it has expired"""
+        left = self.seconds_left()
+        if (left is None and not self.access_token) or (left is not None and left <= self.refresh_margin):
+            if self._adopt_shared():
+                left = self.seconds_left()
+        if left is None:
+            if not self.access_token:
+                self.refresh(stale_token=self.access_token, trigger="initial")
+        elif left <= 0:
+            self.refresh(stale_token=self.access_token, trigger="expired")
+        elif left <= self.refresh_margin:
+            self.refresh_in_background()
+        return self.access_token
+
+    def refresh(self, stale_token=None, trigger="manual"):
+        """Refresh the token; callers arriving during a refresh wait for it.
+
+        If ``stale_token`` is given and the token has already been replaced
+        by another caller, no new request is made. Within the cool-down after
+        a failure only ``trigger="manual"`` refreshes are attempted.
+        """
+        shared_lock = self.state.lock("zoho-token") if self.state is not None else nullcontext()
+        with self._refresh_lock, shared_lock:
+            if stale_token is not None:
+                self._adopt_shared()
+                if self.access_token != stale_token:
+                    return True
+            if trigger != "manual" and self._cooling_down():
+                METRICS.inc("zoho_token_refreshes_total", trigger=trigger, result="skipped")
+                return False
+            data = self.fetch_token()
+            if not data or not data.get("access_token"):
+                self._failed_at = time.monotonic()
+                METRICS.inc("zoho_token_refreshes_total", trigger=trigger, result="failed")
+                return False
+            self._failed_at = None
+            METRICS.inc("zoho_token_refreshes_total", trigger=trigger, result="ok")
+            self.access_token = data["access_token"]
+            expires_in = data.get("expires_in")
+            self.expires_at = time.time() + float(expires_in) if expires_in else None
+            self._save()
+            if self.state is not None:
+                self.state.set(TOKEN_STATE_KEY, {"access_token": self.access_token, "expires_at": self.expires_at})
+            return True
+
+    def refresh_in_background(self):
+        """Start a proactive refresh unless one is already running"""
+        if self._background is not None and self._background.is_alive():
+            return
+        if self._cooling_down():
+            return
+        stale = self.access_token
+        self._background = threading.Thread(target=self.refresh, args=(stale, "proactive"), daemon=True)
+        self._background.start()
@@ -0,0 +1,54 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 15
+SUPPORTED_METHODS = ("GET", "POST", "PATCH", "PUT", "DELETE")
+
+
+class Transport:
+    """Interface used by ZohoDeskAPI to send HTTP requests.
+
+    Anything with a matching ``request`` method (for example a transport
+    pointed at a local stub server) can be passed to the client instead.
+    """
+
+    def request(self, method, url, headers=None, **kwargs):
+        raise NotImplementedError
+
+    def was_not_sent(self, error):
+        """True if ``error`` means the request never reached the server"""
+        return False
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    """Pooled keep-alive transport backed by a shared requests.Session"""
+
+    def __init__(self, pool_connections=4, pool_maxsize=32,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT):
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method, url, headers=None, **kwargs):
+        method = method.upper()
+        if method not in SUPPORTED_METHODS:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, headers=headers, **kwargs)
+
+    def was_not_sent(self, error):
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+            return isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+        return False
+
+    def close(self):
+        self.session.close()
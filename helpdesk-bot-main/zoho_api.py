@@ -1,20 +1,93 @@
-import requests
-import streamlit as st
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from config import get_setting
+from transport import RequestsTransport, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from token_manager import TokenManager, DEFAULT_REFRESH_MARGIN, DEFAULT_FAILURE_COOLDOWN
+from ticket_cache import TicketCache, SharedTicketCache
+from metrics import METRICS, endpoint_label, record_response, record_failure
+from retry import RetryPolicy, IDEMPOTENT_METHODS, shared_bucket
+from ticket_mirror import TicketMirror
+from shared_state import get_state
+from formatting import format_ticket_display, format_ticket_summary  # noqa: F401 (re-exported)
+
+def _error_result(response):
+    """Failure result that keeps the HTTP status visible.
+
+    Note that a 4xx/5xx ``requests.Response`` is falsy, so callers must
+    test ``response is not None`` rather than ``response``.
+    """
+    if response is None:
+        return {'success': False, 'error': 'Error: No response'}
+    return {
+        'success': False,
+        'error': f"Error: HTTP {response.status_code} {response.text[:200]}".rstrip(),
+        'status': response.status_code
+    }
 
 class ZohoDeskAPI:
-    def __init__(self):
-        self.base_url = st.secrets.get("ZOHO_API_DOMAIN", "https://desk.zoho.in")
-        self.access_token = st.secrets.get("ZOHO_ACCESS_TOKEN", "")
-        self.refresh_token = st.secrets.get("ZOHO_REFRESH_TOKEN", "")
-        self.client_id = st.secrets.get("ZOHO_CLIENT_ID", "")
-        self.client_secret = st.secrets.get("ZOHO_CLIENT_SECRET", "")
-        self.org_id = st.secrets.get("ZOHO_ORG_ID", "")
+    def __init__(self, transport=None, base_url=None, accounts_url=None, mirror=None, state=None):
+        self.base_url = base_url or get_setting("ZOHO_API_DOMAIN", "https://desk.zoho.in")
+        self.accounts_url = accounts_url or get_setting("ZOHO_ACCOUNTS_URL", "https://accounts.zoho.in/oauth/v2/token")
+        self.refresh_token = get_setting("ZOHO_REFRESH_TOKEN", "")
+        self.client_id = get_setting("ZOHO_CLIENT_ID", "")
+        self.client_secret = get_setting("ZOHO_CLIENT_SECRET", "")
+        self.org_id = get_setting("ZOHO_ORG_ID", "")
+        self.transport = transport or RequestsTransport(
+            pool_maxsize=int(get_setting("ZOHO_POOL_SIZE", 32)),
+            connect_timeout=float(get_setting("ZOHO_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)),
+            read_timeout=float(get_setting("ZOHO_READ_TIMEOUT", DEFAULT_READ_TIMEOUT))
+        )
+        # With a cross-process backend the token, quota and cache are shared by every worker
+        state = state or get_state()
+        self.state = state if state.shared else None
+        self.tokens = TokenManager(
+            self.fetch_access_token,
+            access_token=get_setting("ZOHO_ACCESS_TOKEN", ""),
+            refresh_margin=float(get_setting("ZOHO_TOKEN_REFRESH_MARGIN", DEFAULT_REFRESH_MARGIN)),
+            failure_cooldown=float(get_setting("ZOHO_TOKEN_FAILURE_COOLDOWN", DEFAULT_FAILURE_COOLDOWN)),
+            cache_file=get_setting("ZOHO_TOKEN_CACHE_FILE") or None,
+            state=self.state
+        )
+        cache_settings = dict(
+            maxsize=int(get_setting("ZOHO_CACHE_SIZE", 1024)),
+            ttl=float(get_setting("ZOHO_CACHE_TTL", 60)),
+            negative_ttl=float(get_setting("ZOHO_CACHE_NEGATIVE_TTL", 15))
+        )
+        self.cache = SharedTicketCache(self.state, **cache_settings) if self.state else TicketCache(**cache_settings)
+        METRICS.register_collector("ticket_cache", self.cache.metric_samples)
+        self.retry = RetryPolicy(
+            max_attempts=int(get_setting("ZOHO_RETRY_ATTEMPTS", 4)),
+            base_delay=float(get_setting("ZOHO_RETRY_BASE_DELAY", 0.3)),
+            max_delay=float(get_setting("ZOHO_RETRY_MAX_DELAY", 8))
+        )
+        # Shared by every client in the process (or node) so the org quota is respected as a whole
+        self.limiter = shared_bucket(
+            f"zoho:{self.org_id}",
+            rate=float(get_setting("ZOHO_RATE_LIMIT_PER_SECOND", 10)),
+            capacity=float(get_setting("ZOHO_RATE_LIMIT_BURST", 20)),
+            state=self.state
+        )
+        mirror_path = get_setting("ZOHO_MIRROR_PATH")
+        self.mirror = mirror or (TicketMirror(mirror_path) if mirror_path else None)
+        self.mirror_max_staleness = float(get_setting("ZOHO_MIRROR_MAX_STALENESS", 120))
+        self.pool = ThreadPoolExecutor(
+            max_workers=int(get_setting("ZOHO_FANOUT_WORKERS", 8)),
+            thread_name_prefix="zoho-fanout"
+        )
+
+    @property
+    def access_token(self):
+        return self.tokens.access_token
         
     def refresh_access_token(self):
         """Refresh the access token using refresh token"""
+        return self.tokens.refresh()
+
+    def fetch_access_token(self):
+        """Request a new access token; returns the token response or None"""
         try:
-            url = "https://accounts.zoho.in/oauth/v2/token"
+            url = self.accounts_url
             params = {
                 "refresh_token": self.refresh_token,
                 "client_id": self.client_id,
@@ -22,63 +95,147 @@ class ZohoDeskAPI:
                 "grant_type": "refresh_token"
             }
             
-            response = requests.post(url, params=params)
+            response = self.transport.request("POST", url, params=params)
             
             if response.status_code == 200:
-                data = response.json()
-                self.access_token = data.get("access_token")
-                return True
+                return response.json()
             else:
-                return False
+                METRICS.inc("zoho_token_refresh_errors_total", error=f"HTTP {response.status_code}")
+                return None
         except Exception as e:
-            return False
+            METRICS.inc("zoho_token_refresh_errors_total", error=type(e).__name__)
+            return None
     
-    def get_headers(self):
+    def get_headers(self, token=None):
         """Get headers with current access token"""
+        token = token or self.tokens.get_token()
         return {
-            'Authorization': f'Zoho-oauthtoken {self.access_token}',
+            'Authorization': f'Zoho-oauthtoken {token}',
             'orgId': self.org_id,
             'Content-Type': 'application/json'
         }
     
-    def make_request(self, method, url, **kwargs):
-        """Make API request with automatic token refresh"""
-        headers = self.get_headers()
-        
-        if method.upper() == "GET":
-            response = requests.get(url, headers=headers, **kwargs)
-        elif method.upper() == "POST":
-            response = requests.post(url, headers=headers, **kwargs)
-        else:
-            return None
-        
-        # If token is invalid, refresh and retry
-        if response.status_code == 401 or "INVALID_OAUTH" in response.text:
-            if self.refresh_access_token():
-                headers = self.get_headers()
-                if method.upper() == "GET":
-                    response = requests.get(url, headers=headers, **kwargs)
-                else:
-                    response = requests.post(url, headers=headers, **kwargs)
-        
+    def send(self, method, url, token, **kwargs):
+        """Send one request through the transport and record its metrics"""
+        started = time.perf_counter()
+        try:
+            response = self.transport.request(method, url, headers=self.get_headers(token), **kwargs)
+        except Exception as e:
+            record_failure(method, url, started, e)
+            raise
+        record_response(method, url, started, response)
         return response
     
-    def get_ticket(self, ticket_id):
-        """Fetch ticket details by ID"""
+    def make_request(self, method, url, idempotent=None, **kwargs):
+        """Make API request with rate limiting, retries and token refresh.
+
+        POST/PATCH requests are treated as non-idempotent unless
+        ``idempotent=True`` and are never retried once the server may have
+        processed them, so a ticket is not created twice.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        token = self.tokens.get_token()
+        refreshed = False
+        attempt = 0
+        while True:
+            waited = self.limiter.acquire()
+            if waited:
+                METRICS.observe("zoho_rate_limit_wait_seconds", waited)
+            try:
+                response = self.send(method, url, token, **kwargs)
+            except Exception as e:
+                if not self.retry.should_retry_error(attempt, self.transport.was_not_sent(e), idempotent):
+                    raise
+                METRICS.inc("zoho_retries_total", endpoint=endpoint_label(method, url), reason=type(e).__name__)
+                time.sleep(self.retry.delay(attempt))
+                attempt += 1
+                continue
+            
+            # If token is invalid, refresh (once across all sessions) and retry
+            if response.status_code == 401 or "INVALID_OAUTH" in response.text:
+                if refreshed:
+                    return response
+                refreshed = True
+                METRICS.inc("zoho_retries_total", endpoint=endpoint_label(method, url), reason="401")
+                if not self.tokens.refresh(stale_token=token, trigger="401"):
+                    return response
+                token = self.tokens.access_token
+                continue
+            
+            if self.retry.should_retry_status(attempt, response.status_code, idempotent):
+                delay = self.retry.delay(attempt, response.headers.get("Retry-After"))
+                if response.status_code == 429:
+                    self.limiter.pause(delay)
+                METRICS.inc("zoho_retries_total", endpoint=endpoint_label(method, url), reason=str(response.status_code))
+                time.sleep(delay)
+                attempt += 1
+                continue
+            return response
+    
+    def get_ticket(self, ticket_id, modified_time=None):
+        """Fetch ticket details by ID, serving from the cache when possible.
+
+        If ``modified_time`` is known (e.g. from a ticket list), an expired
+        cache entry with the same modifiedTime is reused instead of refetched.
+        """
+        cached = self.cache.get(ticket_id)
+        if cached is None and modified_time:
+            cached = self.cache.revalidate(ticket_id, modified_time)
+        if cached is not None:
+            return cached
+        return self._load_ticket(ticket_id)
+
+    def _load_ticket(self, ticket_id):
+        """Mirror or API lookup for a cache miss; the result is cached"""
+        result = self._mirrored_ticket(ticket_id) or self._fetch_ticket(ticket_id)
+        self.cache.put(ticket_id, result)
+        return result
+
+    def _mirrored_ticket(self, ticket_id):
+        """Serve from the local mirror if it synced within the staleness bound"""
+        if self.mirror is None:
+            return None
+        age = self.mirror.age()
+        if age is None or age > self.mirror_max_staleness:
+            METRICS.inc("ticket_mirror_lookups_total", result="stale")
+            return None
+        ticket = self.mirror.get(ticket_id)
+        METRICS.inc("ticket_mirror_lookups_total", result="hit" if ticket else "miss")
+        return {'success': True, 'data': ticket} if ticket else None
+
+    def _fetch_ticket(self, ticket_id):
         try:
             url = f"{self.base_url}/api/v1/tickets/{ticket_id}"
             response = self.make_request("GET", url)
             
-            if response and response.status_code == 200:
+            if response is not None and response.status_code == 200:
                 return {'success': True, 'data': response.json()}
-            elif response and response.status_code == 404:
+            elif response is not None and response.status_code == 404:
                 return {'success': False, 'error': 'Ticket not found'}
             else:
-                error_msg = response.json() if response else "Unknown error"
-                return {'success': False, 'error': f'Error: {error_msg}'}
+                return _error_result(response)
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
+    def get_tickets(self, ticket_ids):
+        """Fetch several tickets concurrently.
+
+        Duplicate IDs are fetched once; returns ``{ticket_id: result}`` in
+        the order the IDs were first given.
+        """
+        ids = list(dict.fromkeys(str(t) for t in ticket_ids))
+        results = {}
+        for ticket_id in ids:
+            cached = self.cache.get(ticket_id)
+            if cached is not None:
+                results[ticket_id] = cached
+        missing = [t for t in ids if t not in results]
+        # Misses were already counted above, so skip get_ticket's cache lookup
+        for ticket_id, result in zip(missing, self.pool.map(self._load_ticket, missing)):
+            results[ticket_id] = result
+        return {t: results[t] for t in ids}
+    
     def create_ticket(self, subject, description, email, priority="High"):
         """Create a new ticket"""
         try:
@@ -95,11 +252,85 @@ class ZohoDeskAPI:
             
             response = self.make_request("POST", url, json=payload)
             
-            if response and response.status_code == 200:
-                return {'success': True, 'data': response.json()}
+            if response is not None and response.status_code == 200:
+                ticket = response.json()
+                self.cache.put(ticket.get('id') or ticket.get('ticketNumber'), {'success': True, 'data': ticket})
+                return {'success': True, 'data': ticket}
+            else:
+                return _error_result(response)
+        except Exception as e:
+            return {'success': False, 'error': str(e), 'not_sent': self.transport.was_not_sent(e)}
+    
+    def list_tickets(self, from_index=0, limit=100, modified_since=None):
+        """List tickets in ascending modifiedTime order, optionally only
+        those modified at or after ``modified_since`` (ISO timestamp)"""
+        try:
+            url = f"{self.base_url}/api/v1/tickets"
+            params = {"from": from_index, "limit": min(int(limit), 100), "sortBy": "modifiedTime"}
+            if modified_since:
+                now = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.000Z")
+                params["modifiedTimeRange"] = f"{modified_since},{now}"
+            response = self.make_request("GET", url, params=params)
+            
+            if response is not None and response.status_code == 200:
+                return {'success': True, 'data': response.json().get('data', [])}
+            elif response is not None and response.status_code == 204:
+                return {'success': True, 'data': []}
             else:
-                error_text = response.text if response else "No response"
-                return {'success': False, 'error': f'Error: {error_text}'}
+                return _error_result(response)
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+    
+    def search_tickets(self, query="", status=None, priority=None, assignee=None, limit=50):
+        """Search tickets via the Desk search endpoint.
+
+        ``assignee`` is passed as the agent ID expected by the API.
+        """
+        try:
+            url = f"{self.base_url}/api/v1/tickets/search"
+            params = {"limit": min(int(limit), 100), "sortBy": "-modifiedTime"}
+            if query:
+                params["_all"] = query
+            if status:
+                params["status"] = status
+            if priority:
+                params["priority"] = priority
+            if assignee:
+                params["assigneeId"] = assignee
+            response = self.make_request("GET", url, params=params)
+            
+            if response is not None and response.status_code == 200:
+                return {'success': True, 'data': response.json().get('data', [])}
+            elif response is not None and response.status_code == 204:
+                return {'success': True, 'data': []}
+            else:
+                return _error_result(response)
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+    
+    def get_ticket_comments(self, ticket_id, page=0, limit=20):
+        """One page of a ticket's comments, newest first"""
+        return self._get_page(
+            f"{self.base_url}/api/v1/tickets/{ticket_id}/comments", page, limit, sortBy="-commentedTime"
+        )
+    
+    def get_ticket_threads(self, ticket_id, page=0, limit=20):
+        """One page of a ticket's email/channel threads, newest first"""
+        return self._get_page(f"{self.base_url}/api/v1/tickets/{ticket_id}/threads", page, limit)
+    
+    def _get_page(self, url, page, limit, **params):
+        limit = min(int(limit), 100)
+        try:
+            response = self.make_request("GET", url, params={"from": int(page) * limit, "limit": limit, **params})
+            
+            if response is not None and response.status_code == 200:
+                return {'success': True, 'data': response.json().get('data', [])}
+            elif response is not None and response.status_code == 204:
+                return {'success': True, 'data': []}
+            elif response is not None and response.status_code == 404:
+                return {'success': False, 'error': 'Ticket not found'}
+            else:
+                return _error_result(response)
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
@@ -109,45 +340,11 @@ class ZohoDeskAPI:
             url = f"{self.base_url}/api/v1/tickets/{ticket_id}/comments"
             payload = {"content": comment, "isPublic": True}
             response = self.make_request("POST", url, json=payload)
+            self.cache.invalidate(ticket_id)
             
-            if response and response.status_code == 200:
+            if response is not None and response.status_code == 200:
                 return {'success': True, 'data': response.json()}
             else:
-                return {'success': False, 'error': 'Failed to add comment'}
+                return _error_result(response)
         except Exception as e:
-            return {'success': False, 'error': str(e)}
-
-def format_ticket_display(ticket_data):
-    """Format ticket data for display"""
-    ticket = ticket_data.get('data', {})
-    
-    status_emoji = {
-        'Open': '🔴',
-        'In Progress': '🟡',
-        'On Hold': '🟠',
-        'Closed': '🟢'
-    }
-    
-    priority_emoji = {
-        'High': '🔥',
-        'Medium': '⚠️',
-        'Low': '📌'
-    }
-    
-    return f"""
-### 📋 Ticket Details
-
-**Ticket ID:** #{ticket.get('ticketNumber', 'N/A')}
-
-**Status:** {status_emoji.get(ticket.get('status'), '⚪')} {ticket.get('status', 'Unknown')}
-
-**Priority:** {priority_emoji.get(ticket.get('priority'), '📌')} {ticket.get('priority', 'Normal')}
-
-**Subject:** {ticket.get('subject', 'No subject')}
-
-**Created:** {ticket.get('createdTime', 'N/A')}
-
-**Last Updated:** {ticket.get('modifiedTime', 'N/A')}
-
-**Assigned To:** {ticket.get('assignee', {}).get('name', 'Unassigned')}
-"""
+            return {'success': False, 'error': str(e), 'not_sent': self.transport.was_not_sent(e)}